@@ -2,8 +2,29 @@ import dash
 from dash import Dash, html, dcc
 import dash_bootstrap_components as dbc
 
-# Create the Dash application with multi-page support
-app = Dash(__name__, use_pages=True, external_stylesheets=[dbc.themes.BOOTSTRAP])
+from utils.config import (
+    COMPRESS_MIN_SIZE, COMPRESS_RESPONSES, DASH_DEBUG, DASH_PORT, METRICS_ENABLED, PROFILING_ENABLED
+)
+from utils.http import install_compression, install_static_cache_headers
+from utils.layout_cache import install_layout_cache
+from utils.metrics import install_metrics
+from utils.profiling import install_profiling
+from utils.serialization import configure_json_engine
+from utils.sessions import install_sessions
+from utils.uploads import install_upload_routes
+
+# Serialize callback responses with orjson when it is installed
+configure_json_engine()
+
+# Create the Dash application with multi-page support.
+# Page layouts may be functions that load data on first visit; suppressing callback
+# exceptions stops Dash from calling every layout at startup to build a validation layout.
+app = Dash(
+    __name__,
+    use_pages=True,
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    suppress_callback_exceptions=True
+)
 
 # Define the app layout with navigation and page container
 app.layout = html.Div([
@@ -30,7 +51,7 @@ app.layout = html.Div([
     ], className='app-content')
 ], className='app-container')
 
-# Add custom CSS
+# Page template; the site styles live in assets/style.css, which Dash serves with a cache-busting fingerprint
 app.index_string = '''
 <!DOCTYPE html>
 <html>
@@ -39,126 +60,6 @@ app.index_string = '''
         <title>{%title%}</title>
         {%favicon%}
         {%css%}
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+JP:wght@300;400;500;700&display=swap');
-            
-            body {
-                font-family: 'Noto Sans JP', sans-serif;
-                margin: 0;
-                background-color: #f8f9fa;
-                color: #343a40;
-            }
-            .app-container {
-                display: flex;
-                flex-direction: column;
-                min-height: 100vh;
-            }
-            .app-header {
-                background: linear-gradient(135deg, #6a11cb 0%, #2575fc 100%);
-                color: white;
-                padding: 1.5rem;
-                text-align: center;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }
-            .app-header-title {
-                margin: 0;
-                font-weight: 700;
-                letter-spacing: 1px;
-            }
-            .app-navigation {
-                display: flex;
-                justify-content: center;
-                background-color: white;
-                padding: 0.75rem;
-                overflow-x: auto;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-                position: sticky;
-                top: 0;
-                z-index: 1000;
-            }
-            .nav-item {
-                padding: 0 1.5rem;
-            }
-            .nav-link {
-                color: #495057;
-                text-decoration: none;
-                font-weight: 500;
-                padding: 0.5rem 0;
-                display: inline-block;
-                position: relative;
-                transition: color 0.3s ease;
-            }
-            .nav-link:hover {
-                color: #6a11cb;
-            }
-            .nav-link::after {
-                content: '';
-                position: absolute;
-                width: 0;
-                height: 2px;
-                bottom: 0;
-                left: 0;
-                background-color: #6a11cb;
-                transition: width 0.3s ease;
-            }
-            .nav-link:hover::after {
-                width: 100%;
-            }
-            .app-content {
-                flex: 1;
-                padding: 2rem;
-                max-width: 1200px;
-                margin: 0 auto;
-                width: 100%;
-                box-sizing: border-box;
-            }
-            .card {
-                background: white;
-                border-radius: 12px;
-                box-shadow: 0 10px 15px -3px rgba(0,0,0,0.05), 0 4px 6px -2px rgba(0,0,0,0.03);
-                padding: 1.5rem;
-                margin-bottom: 2rem;
-                transition: transform 0.2s ease, box-shadow 0.2s ease;
-            }
-            .card:hover {
-                transform: translateY(-5px);
-                box-shadow: 0 15px 20px -3px rgba(0,0,0,0.1), 0 4px 6px -2px rgba(0,0,0,0.05);
-            }
-            .card-title {
-                margin-top: 0;
-                color: #6a11cb;
-                border-bottom: 1px solid #e9ecef;
-                padding-bottom: 0.75rem;
-                font-weight: 600;
-                letter-spacing: 0.5px;
-            }
-            .section-card {
-                background: white;
-                border-radius: 8px;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.05);
-                padding: 1.25rem;
-                transition: transform 0.2s ease, box-shadow 0.2s ease;
-            }
-            .section-card:hover {
-                transform: translateY(-3px);
-                box-shadow: 0 8px 15px rgba(0,0,0,0.1);
-            }
-            .section-link {
-                display: inline-block;
-                background: linear-gradient(135deg, #6a11cb 0%, #2575fc 100%);
-                color: white;
-                padding: 0.5rem 1rem;
-                border-radius: 4px;
-                text-decoration: none;
-                font-weight: 500;
-                margin-top: 1rem;
-                transition: transform 0.2s ease, box-shadow 0.2s ease;
-            }
-            .section-link:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-            }
-        </style>
     </head>
     <body>
         {%app_entry%}
@@ -171,6 +72,33 @@ app.index_string = '''
 </html>
 '''
 
-# Run the server
+# Long-lived caching for fingerprinted bundles/assets, then compression of everything sizeable
+install_static_cache_headers(app)
+if COMPRESS_RESPONSES:
+    install_compression(app, min_size=COMPRESS_MIN_SIZE)
+
+# Per-callback timing histograms at /metrics
+if METRICS_ENABLED:
+    install_metrics(app)
+
+# Opt-in profiles of single callback requests, listed at /_profiles
+if PROFILING_ENABLED:
+    install_profiling(app)
+
+# Session id cookie for the server-side session store; installed before the layout cache,
+# whose before_request hook can answer a request on its own
+install_sessions(app)
+
+# Chunked file uploads that replace the visualization datasets
+install_upload_routes(app)
+
+# Static layouts (app shell and pages without layout functions) are serialized once and served with ETags
+layout_cache = install_layout_cache(app)
+layout_cache.prime()
+
+# WSGI entry point for production servers, e.g. `gunicorn -c gunicorn.conf.py app:server`
+server = app.server
+
+# Run the development server
 if __name__ == '__main__':
-    app.run_server(debug=True, port=8051)
\ No newline at end of file
+    app.run_server(debug=DASH_DEBUG, port=DASH_PORT)
\ No newline at end of file
@@ -0,0 +1,36 @@
+// Clientside versions of the pure-presentation callbacks.
+// The Python callbacks in pages/ stay as the fallback (DASH_CLIENTSIDE_CALLBACKS=0).
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    viz: {
+        // Reorder the bars of the single px.bar trace in the figure already on the page
+        sortBars: function (sortOrder, figure) {
+            var trace = figure.data[0];
+            var order = trace.x.map(function (_, i) { return i; });
+            if (sortOrder === 'ascending') {
+                order.sort(function (a, b) { return trace.y[a] - trace.y[b]; });
+            } else if (sortOrder === 'descending') {
+                order.sort(function (a, b) { return trace.y[b] - trace.y[a]; });
+            } else {
+                order.sort(function (a, b) { return trace.x[a] < trace.x[b] ? -1 : trace.x[a] > trace.x[b] ? 1 : 0; });
+            }
+            var pick = function (values) { return order.map(function (i) { return values[i]; }); };
+            var sorted = Object.assign({}, trace, {
+                x: pick(trace.x),
+                y: pick(trace.y),
+                marker: Object.assign({}, trace.marker, {color: pick(trace.marker.color)})
+            });
+            return Object.assign({}, figure, {data: [sorted]});
+        }
+    },
+
+    components: {
+        formSubmitted: function (nClicks) {
+            return '送信済み (' + nClicks + ')';
+        },
+
+        submitSummary: function (nClicks) {
+            var total = nClicks.reduce(function (sum, n) { return sum + (n || 0); }, 0);
+            return '全フォームの送信回数: ' + total;
+        }
+    }
+});
@@ -0,0 +1,102 @@
+// Chunked uploads for #chunked-upload-drop (utils/uploads.py).
+// The file is sliced with Blob.slice and POSTed one slice at a time, so neither the
+// browser nor the server ever holds a base64 copy of the whole file.
+(function () {
+    var pendingFile = null;
+
+    function uploadUrl(uploadId, action, params) {
+        var config = JSON.parse(document.getElementById('_dash-config').textContent);
+        var query = new URLSearchParams(params || {}).toString();
+        return config.requests_pathname_prefix + '_upload/' + uploadId + '/' + action + (query ? '?' + query : '');
+    }
+
+    function newUploadId() {
+        var bytes = new Uint8Array(16);
+        window.crypto.getRandomValues(bytes);
+        return Array.prototype.map.call(bytes, function (b) { return ('0' + b.toString(16)).slice(-2); }).join('');
+    }
+
+    function sendFile(file, uploadId, target, chunkSize) {
+        var offset = 0;
+        var sent = false;
+
+        function next() {
+            // The first request always goes out, so the server also sees (and rejects) an empty file
+            if (sent && offset >= file.size) {
+                return fetch(uploadUrl(uploadId, 'complete'), {method: 'POST'});
+            }
+            sent = true;
+            var end = Math.min(offset + chunkSize, file.size);
+            var params = {offset: offset, total: file.size};
+            if (offset === 0) {
+                params.filename = file.name;
+                params.target = target;
+            }
+            return fetch(uploadUrl(uploadId, 'chunk', params), {
+                method: 'POST',
+                headers: {'Content-Type': 'application/octet-stream'},
+                body: file.slice(offset, end)
+            }).then(function (response) {
+                return response.json().then(function (body) {
+                    if (response.status === 409 && body.received !== undefined) {
+                        offset = body.received;  // resume from what the server has
+                    } else if (!response.ok) {
+                        throw new Error(body.error);
+                    } else {
+                        offset = body.received;
+                    }
+                    return next();
+                });
+            });
+        }
+
+        // Failures are recorded server-side in the status the page polls
+        next().catch(function (err) { console.error('upload failed', err); });
+    }
+
+    function chooseFile(callback) {
+        var input = document.createElement('input');
+        input.type = 'file';
+        input.accept = '.csv,.parquet,.pq';
+        input.onchange = function () {
+            if (input.files.length) {
+                callback(input.files[0]);
+            }
+        };
+        input.click();
+    }
+
+    // A dropped file is held here and picked up by the click it triggers on the drop zone
+    document.addEventListener('dragover', function (event) {
+        if (event.target.closest && event.target.closest('#chunked-upload-drop')) {
+            event.preventDefault();
+        }
+    });
+    document.addEventListener('drop', function (event) {
+        var zone = event.target.closest && event.target.closest('#chunked-upload-drop');
+        if (!zone || !event.dataTransfer.files.length) {
+            return;
+        }
+        event.preventDefault();
+        pendingFile = event.dataTransfer.files[0];
+        zone.click();
+    });
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        uploads: {
+            start: function (nClicks, target) {
+                var zone = document.getElementById('chunked-upload-drop');
+                var chunkSize = parseInt(zone.getAttribute('data-chunk-size'), 10);
+                var uploadId = newUploadId();
+                var start = function (file) { sendFile(file, uploadId, target, chunkSize); };
+                if (pendingFile) {
+                    start(pendingFile);
+                    pendingFile = null;
+                } else {
+                    chooseFile(start);
+                }
+                return uploadId;
+            }
+        }
+    });
+})();
@@ -0,0 +1,82 @@
+# Checks every server-side page callback against the budget declared next to it (@budget,
+# utils/budgets.py): serialized response bytes and median latency of its benchmarks.callbacks
+# scenarios, rendered offline with every figure built from scratch.
+# Exits 1 when a callback is over budget, errors, or has no budget or no scenario.
+# Run from the project root: python -m benchmarks.budgets
+import argparse
+import json
+import os
+
+from benchmarks.callbacks import SCENARIOS, build_payload, dependencies, find_dependency, load_app, run_scenario
+from utils.budgets import CALLBACK_BUDGETS
+
+# No figure cache tiers, so the latency budget covers building the figure rather than a cache hit
+os.environ.setdefault('FIGURE_CACHE_MEMORY_BYTES', '0')
+os.environ.setdefault('DASH_SINGLE_FLIGHT', '0')
+
+
+def page_callbacks(app):
+    # Function names of the Python callbacks the pages registered (not Dash's own)
+    return {
+        entry['callback'].__name__
+        for entry in app.callback_map.values()
+        if 'callback' in entry and entry['callback'].__module__.startswith('pages.')
+    }
+
+
+def check(result, limits):
+    failures = []
+    if result['errors']:
+        failures.append(f"{result['errors']} failed requests")
+    if limits['max_bytes'] is not None and result['response_bytes'] > limits['max_bytes']:
+        failures.append(f"{result['response_bytes']:,} bytes > {limits['max_bytes']:,}")
+    if limits['max_p50_ms'] is not None and result['p50_ms'] > limits['max_p50_ms']:
+        failures.append(f"p50 {result['p50_ms']:.1f} ms > {limits['max_p50_ms']} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=15)
+    parser.add_argument('--output', help='write measurements as JSON to this path')
+    args = parser.parse_args()
+
+    app = load_app()
+    deps = dependencies(app)
+
+    failures = []
+    measured = {}
+    covered = set()
+    print(f"{'scenario':<26} {'callback':<24} {'bytes':>9} {'budget':>9} {'p50 ms':>8} {'budget':>7}  status")
+    for name, scenario in SCENARIOS.items():
+        dependency = find_dependency(deps, scenario['output'], scenario['changed'])
+        callback = app.callback_map[dependency['output']]['callback'].__name__
+        covered.add(callback)
+        payload = build_payload(dependency, scenario['values'], scenario['changed'], scenario.get('index'))
+        # Sequential requests: the median is the latency of one request, not of a queue
+        result = measured[name] = run_scenario(app, payload, args.requests, 1)
+
+        limits = CALLBACK_BUDGETS.get(callback)
+        problems = ['no budget declared'] if limits is None else check(result, limits)
+        failures.extend(f'{name} ({callback}): {problem}' for problem in problems)
+        limits = limits or {}
+        max_bytes = '-' if limits.get('max_bytes') is None else f"{limits['max_bytes']:,}"
+        max_p50 = '-' if limits.get('max_p50_ms') is None else limits['max_p50_ms']
+        print(f"{name:<26} {callback:<24} {result['response_bytes']:>9,} {max_bytes:>9} "
+              f"{result['p50_ms']:>8.1f} {max_p50:>7}  {'FAIL' if problems else 'ok'}")
+
+    for callback in sorted(page_callbacks(app) - covered):
+        failures.append(f'{callback}: no scenario in benchmarks/callbacks.py')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'budgets': CALLBACK_BUDGETS, 'scenarios': measured}, f, indent=2)
+
+    for line in failures:
+        print(f'OVER BUDGET {line}')
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+# Offline load test for every server-side callback, through Flask's test client (no network)
+# Run from the project root: python -m benchmarks.callbacks --concurrency 8 --requests 200 --output results.json
+import argparse
+import json
+import os
+import platform
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Register the Python versions of every callback, not the clientside ones, and run
+# background callbacks inline so each request measures the whole computation
+os.environ.setdefault('DASH_CLIENTSIDE_CALLBACKS', '0')
+os.environ.setdefault('DASH_BACKGROUND_CALLBACKS', '0')
+os.environ.setdefault('FIGURE_CACHE_DISK', '0')
+
+DEFAULT_DATES = {
+    'date-picker-range.start_date': '2023-01-01',
+    'date-picker-range.end_date': '2023-04-10',
+}
+
+# name -> output of the callback, values for its inputs/state, and which props changed
+SCENARIOS = {
+    'update_timeseries': {
+        'output': '..time-series-chart.figure...timeseries-job.data...timeseries-rendered.data..',
+        'values': {
+            'timeseries-checklist.value': ['value_a', 'value_b'],
+            'timeseries-downsample-method.value': 'lttb',
+            'timeseries-resolution.value': 'auto',
+            'timeseries-band.value': 'minmax',
+            'time-series-chart.relayoutData': None,
+            **DEFAULT_DATES,
+        },
+        'changed': ['date-picker-range.start_date'],
+    },
+    'update_timeseries_toggle': {
+        'output': 'time-series-chart.figure',
+        'values': {
+            'timeseries-checklist.value': ['value_a'],
+            'timeseries-downsample-method.value': 'lttb',
+            'timeseries-resolution.value': 'auto',
+            'timeseries-band.value': 'minmax',
+            'time-series-chart.relayoutData': None,
+            **DEFAULT_DATES,
+        },
+        'changed': ['timeseries-checklist.value'],
+    },
+    'update_timeseries_rollup': {
+        'output': '..time-series-chart.figure...timeseries-job.data...timeseries-rendered.data..',
+        'values': {
+            'timeseries-checklist.value': ['value_a', 'value_b'],
+            'timeseries-downsample-method.value': 'lttb',
+            'timeseries-resolution.value': 'week',
+            'timeseries-band.value': 'p5p95',
+            'time-series-chart.relayoutData': None,
+            **DEFAULT_DATES,
+        },
+        'changed': ['timeseries-resolution.value'],
+    },
+    'render_timeseries_job': {
+        # A raw slice too large to answer inline, as update_timeseries hands it over
+        'output': 'time-series-chart.figure',
+        'values': {
+            'timeseries-job.data': [['value_a', 'value_b'], *DEFAULT_DATES.values(), 'lttb', None, 'raw', 'minmax'],
+        },
+        'changed': ['timeseries-job.data'],
+    },
+    'extend_live_chart': {
+        'output': '..live-chart.extendData...live-cursor.data..',
+        'values': {'live-interval.n_intervals': 1, 'live-cursor.data': 0},
+        'changed': ['live-interval.n_intervals'],
+    },
+    'update_scatter': {
+        'output': 'scatter-plot.figure',
+        'values': {'scatter-category-filter.value': ['A'], 'scatter-plot.relayoutData': None},
+        'changed': ['scatter-category-filter.value'],
+    },
+    'select_scatter_rows': {
+        'output': 'scatter-selection.data',
+        'values': {'scatter-category-filter.value': ['A', 'B']},
+        'changed': ['scatter-category-filter.value'],
+    },
+    'update_scatter_summary': {
+        'output': 'scatter-summary.children',
+        'values': {'scatter-selection.data': {'key': 'scatter-selection', 'token': '0', 'categories': ['A', 'B']}},
+        'changed': ['scatter-selection.data'],
+    },
+    'download_scatter_selection': {
+        'output': 'scatter-download.data',
+        'values': {
+            'scatter-download-button.n_clicks': 1,
+            'scatter-selection.data': {'key': 'scatter-selection', 'token': '0', 'categories': ['A']},
+        },
+        'changed': ['scatter-download-button.n_clicks'],
+    },
+    'update_3d_scatter': {
+        'output': '3d-scatter.figure',
+        'values': {'3d-group-filter.value': 'all'},
+        'changed': ['3d-group-filter.value'],
+    },
+    'update_bar_chart': {
+        'output': 'bar-chart.figure',
+        'values': {'bar-sort-order.value': 'descending'},
+        'changed': [],
+    },
+    'update_demo_output': {
+        'output': 'components-demo-output.children',
+        'values': {
+            'submit-button-demo.n_clicks': 1,
+            'text-input-demo.value': 'hello',
+            'dropdown-demo.value': 'opt1',
+            'slider-demo.value': 50,
+            'checklist-demo.value': ['opt1', 'opt3'],
+        },
+        'changed': ['submit-button-demo.n_clicks'],
+    },
+    'update_upload_progress': {
+        'output': '..chunked-upload-progress.value...chunked-upload-progress.style...chunked-upload-status.children...chunked-upload-interval.disabled...chunked-upload-interval.n_intervals..',
+        'values': {'chunked-upload-id.data': '0' * 32, 'chunked-upload-interval.n_intervals': 1},
+        'changed': ['chunked-upload-interval.n_intervals'],
+    },
+    'bs_form_submit': {
+        'output': '{"index":["MATCH"],"type":"bs-submit"}.children',
+        'values': {
+            'bs-submit.n_clicks': 1,
+            'bs-text-input.value': 'text',
+            'bs-select.value': '1',
+            'bs-checkbox.value': True,
+        },
+        'changed': ['bs-submit.n_clicks'],
+        'index': 1,
+    },
+    'bs_submit_summary': {
+        'output': 'bs-submit-summary.children',
+        'values': {'bs-submit.n_clicks': [1, 0]},
+        'changed': ['bs-submit.n_clicks'],
+        'index': [1, 2],
+    },
+}
+
+
+def load_app():
+    from app import app
+
+    return app
+
+
+def dependencies(app):
+    # Same callback graph the renderer receives
+    client = app.server.test_client()
+    return client.get('/_dash-dependencies').get_json()
+
+
+def find_dependency(deps, output, changed):
+    # Outputs registered with allow_duplicate carry an '@<hash>' suffix; pick by the changed inputs
+    for dep in deps:
+        inputs = {f"{_name(spec['id'])}.{spec['property']}" for spec in dep['inputs']}
+        if re.sub(r'@\w+', '', dep['output']) == output and set(changed) <= inputs:
+            return dep
+    raise LookupError(f'no callback for {output} triggered by {changed}')
+
+
+def _name(spec_id):
+    # Key into a scenario's values: the id, or the 'type' of a pattern-matching id
+    return json.loads(spec_id)['type'] if spec_id.startswith('{') else spec_id
+
+
+def _concrete(spec_id, index):
+    # Pattern-matching ids arrive as JSON; the request names the concrete component(s)
+    if not spec_id.startswith('{'):
+        return spec_id
+    pattern = json.loads(spec_id)
+    if pattern.get('index') == ['ALL']:
+        return [{**pattern, 'index': i} for i in index]
+    return {**pattern, 'index': index}
+
+
+def _props(specs, values, index=None):
+    props = []
+    for spec in specs:
+        component_id = _concrete(spec['id'], index)
+        value = values.get(f"{_name(spec['id'])}.{spec['property']}")
+        if isinstance(component_id, list):
+            props.append([
+                {'id': i, 'property': spec['property'], 'value': v} for i, v in zip(component_id, value)
+            ])
+        else:
+            props.append({'id': component_id, 'property': spec['property'], 'value': value})
+    return props
+
+
+def _prop_id(component_id, prop):
+    if isinstance(component_id, dict):
+        component_id = json.dumps(component_id, sort_keys=True, separators=(',', ':'))
+    return f'{component_id}.{prop}'
+
+
+def _outputs(output, index):
+    # Multi-output callbacks are registered as '..id.prop...id.prop..'
+    specs = output[2:-2].split('...') if output.startswith('..') else [output]
+    outputs = []
+    for spec in specs:
+        component_id, prop = spec.split('@')[0].rsplit('.', 1)
+        outputs.append({'id': _concrete(component_id, index), 'property': prop})
+    return outputs if output.startswith('..') else outputs[0]
+
+
+def build_payload(dependency, values, changed, index=None):
+    # Body of a _dash-update-component request
+    inputs = _props(dependency['inputs'], values, index)
+    changed_ids = []
+    for spec, entry in zip(dependency['inputs'], inputs):
+        if f"{_name(spec['id'])}.{spec['property']}" in changed:
+            first = entry[0] if isinstance(entry, list) else entry
+            changed_ids.append(_prop_id(first['id'], first['property']))
+    return {
+        'output': dependency['output'],
+        'outputs': _outputs(dependency['output'], index),
+        'inputs': inputs,
+        'state': _props(dependency['state'], values, index),
+        'changedPropIds': changed_ids,
+    }
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(app, payload, n_requests, concurrency):
+    local = threading.local()
+
+    def one_request(_):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.server.test_client()
+        started = time.perf_counter()
+        response = client.post('/_dash-update-component', json=payload)
+        elapsed = time.perf_counter() - started
+        return elapsed, len(response.data), response.status_code
+
+    # One untimed request so first-use costs (dataset loading, caches) are not counted
+    one_request(None)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one_request, range(n_requests)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(r[0] for r in results)
+    return {
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'errors': sum(1 for r in results if r[2] != 200),
+        'throughput_rps': n_requests / wall,
+        'p50_ms': percentile(latencies, 50) * 1e3,
+        'p95_ms': percentile(latencies, 95) * 1e3,
+        'p99_ms': percentile(latencies, 99) * 1e3,
+        'mean_ms': sum(latencies) / len(latencies) * 1e3,
+        'response_bytes': results[-1][1],
+    }
+
+
+def compare(current, baseline, tolerance):
+    # Scenario names whose p50 latency or response size grew beyond the tolerance
+    regressions = []
+    for name, result in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None:
+            continue
+        for metric in ('p50_ms', 'response_bytes'):
+            if before[metric] and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {before[metric]:.1f} -> {result[metric]:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--only', nargs='+', choices=sorted(SCENARIOS))
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--baseline', help='previous JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    app = load_app()
+    deps = dependencies(app)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'scenarios': {},
+    }
+    print(f"{'scenario':<26} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'bytes':>9} {'errors':>6}")
+    for name in args.only or SCENARIOS:
+        scenario = SCENARIOS[name]
+        dependency = find_dependency(deps, scenario['output'], scenario['changed'])
+        payload = build_payload(dependency, scenario['values'], scenario['changed'], scenario.get('index'))
+        result = run_scenario(app, payload, args.requests, args.concurrency)
+        report['scenarios'][name] = result
+        print(f"{name:<26} {result['throughput_rps']:>8.1f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+              f"{result['p99_ms']:>8.2f} {result['response_bytes']:>9,} {result['errors']:>6}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
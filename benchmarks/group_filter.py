@@ -0,0 +1,72 @@
+# Category-filter latency: string comparison on an object column vs. the precomputed GroupIndex
+# Run from the project root: python -m benchmarks.group_filter
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.groups import GroupIndex
+
+CATEGORIES = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
+
+
+def make_frame(n_rows):
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'x': rng.normal(0, 1, n_rows),
+        'y': rng.normal(0, 1, n_rows),
+        'size': rng.uniform(5, 25, n_rows),
+        'category': rng.choice(CATEGORIES, n_rows)
+    })
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(sizes, repeat):
+    print(f"{'rows':>12} {'filter':>8} {'object ==/isin (ms)':>20} {'category (ms)':>14} {'GroupIndex (ms)':>16} {'speedup':>8}")
+    for n_rows in sizes:
+        df = make_frame(n_rows)
+        categorical_df = df.assign(category=df['category'].astype('category'))
+        started = time.perf_counter()
+        groups = GroupIndex.from_frame(categorical_df, 'category')
+        build = time.perf_counter() - started
+
+        for label, selection in (('single', 'C'), ('multi', ['B', 'E', 'G'])):
+            if isinstance(selection, list):
+                def scan():
+                    return df[df['category'].isin(selection)]
+
+                def categorical_scan():
+                    return categorical_df[categorical_df['category'].isin(selection)]
+            else:
+                def scan():
+                    return df[df['category'] == selection]
+
+                def categorical_scan():
+                    return categorical_df[categorical_df['category'] == selection]
+
+            def gather():
+                return groups.take(categorical_df, selection)
+
+            baseline = best_of(scan, repeat)
+            categorical = best_of(categorical_scan, repeat)
+            indexed = best_of(gather, repeat)
+            print(f"{n_rows:>12,} {label:>8} {baseline * 1e3:>20.2f} {categorical * 1e3:>14.2f} "
+                  f"{indexed * 1e3:>16.2f} {baseline / indexed:>7.1f}x")
+        print(f"{'':>12} {'build':>8} {'':>20} {'':>14} {build * 1e3:>16.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
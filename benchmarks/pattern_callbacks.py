@@ -0,0 +1,146 @@
+# Callback-graph size and page-load dependency resolution for N comparison forms:
+# one copy-pasted callback per form (string ids) vs one MATCH callback (dict ids).
+# Run from the project root: python -m benchmarks.pattern_callbacks --forms 2 200
+import argparse
+import json
+import statistics
+import time
+
+import dash_bootstrap_components as dbc
+from dash import Dash, html, Input, Output, State, MATCH
+
+
+def form_ids(variant, index):
+    if variant == 'pattern':
+        return {name: {'type': name, 'index': index} for name in ('bs-text-input', 'bs-select', 'bs-checkbox', 'bs-submit')}
+    return {name: f'{name}-{index}' for name in ('bs-text-input', 'bs-select', 'bs-checkbox', 'bs-submit')}
+
+
+def form(ids):
+    return dbc.Form([
+        dbc.Input(type='text', id=ids['bs-text-input']),
+        dbc.Select(id=ids['bs-select'], options=[{'label': str(i), 'value': str(i)} for i in (1, 2, 3)], value='1'),
+        dbc.Checkbox(id=ids['bs-checkbox'], label='同意する', value=False),
+        dbc.Button('送信', id=ids['bs-submit']),
+    ])
+
+
+def submit(n_clicks, text, select, checkbox):
+    return f'送信済み ({n_clicks})'
+
+
+def build_app(variant, n_forms):
+    app = Dash(__name__)
+    app.layout = html.Div([form(form_ids(variant, i)) for i in range(n_forms)])
+
+    if variant == 'pattern':
+        app.callback(
+            Output({'type': 'bs-submit', 'index': MATCH}, 'children'),
+            Input({'type': 'bs-submit', 'index': MATCH}, 'n_clicks'),
+            State({'type': 'bs-text-input', 'index': MATCH}, 'value'),
+            State({'type': 'bs-select', 'index': MATCH}, 'value'),
+            State({'type': 'bs-checkbox', 'index': MATCH}, 'value'),
+            prevent_initial_call=True
+        )(submit)
+    else:
+        for i in range(n_forms):
+            ids = form_ids(variant, i)
+            app.callback(
+                Output(ids['bs-submit'], 'children'),
+                Input(ids['bs-submit'], 'n_clicks'),
+                State(ids['bs-text-input'], 'value'),
+                State(ids['bs-select'], 'value'),
+                State(ids['bs-checkbox'], 'value'),
+                prevent_initial_call=True
+            )(submit)
+    return app
+
+
+def layout_ids(component, found):
+    # Every id in a serialized layout, as the renderer indexes them on load
+    if isinstance(component, dict):
+        props = component.get('props', {})
+        if 'id' in props:
+            found.append(props['id'])
+        children = props.get('children')
+        for child in children if isinstance(children, list) else [children]:
+            layout_ids(child, found)
+    return found
+
+
+def _matches(pattern, component_id):
+    if not isinstance(component_id, dict) or pattern.keys() != component_id.keys():
+        return False
+    return all(isinstance(v, list) or component_id[k] == v for k, v in pattern.items())
+
+
+def resolve(deps, ids):
+    # Python stand-in for the renderer's startup pass: expand every dependency's output,
+    # inputs and state against the ids in the layout and count the resolved props
+    string_ids = {i for i in ids if isinstance(i, str)}
+    dict_ids = [i for i in ids if isinstance(i, dict)]
+
+    def expand(spec_id):
+        if spec_id.startswith('{'):
+            pattern = json.loads(spec_id)
+            return sum(1 for i in dict_ids if _matches(pattern, i))
+        return 1 if spec_id in string_ids else 0
+
+    resolved = 0
+    for dep in deps:
+        resolved += expand(dep['output'].rsplit('.', 1)[0])
+        for spec in dep['inputs'] + dep['state']:
+            resolved += expand(spec['id'])
+    return resolved
+
+
+def measure(variant, n_forms, repeats):
+    started = time.perf_counter()
+    app = build_app(variant, n_forms)
+    build_ms = (time.perf_counter() - started) * 1e3
+    client = app.server.test_client()
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        deps_response = client.get('/_dash-dependencies')
+        layout_response = client.get('/_dash-layout')
+        deps = deps_response.get_json()
+        resolved = resolve(deps, layout_ids(layout_response.get_json(), []))
+        timings.append(time.perf_counter() - started)
+
+    return {
+        'variant': variant,
+        'forms': n_forms,
+        'callback_map': len(app.callback_map),
+        'dependencies_bytes': len(deps_response.data),
+        'layout_bytes': len(layout_response.data),
+        'resolved_props': resolved,
+        'build_ms': build_ms,
+        'page_load_ms': statistics.median(timings) * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--forms', type=int, nargs='+', default=[2, 200])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'variant':<9} {'forms':>6} {'callbacks':>9} {'deps bytes':>11} {'layout bytes':>13} {'resolved':>9} {'build ms':>9} {'load ms':>8}")
+    for n_forms in args.forms:
+        for variant in ('per_form', 'pattern'):
+            result = measure(variant, n_forms, args.repeats)
+            results.append(result)
+            print(f"{variant:<9} {n_forms:>6} {result['callback_map']:>9} {result['dependencies_bytes']:>11,} "
+                  f"{result['layout_bytes']:>13,} {result['resolved_props']:>9} {result['build_ms']:>9.1f} {result['page_load_ms']:>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# Conditional GETs the way a browser sends them: fetch with compression accepted, then send the
+# returned ETag back (with flask-compress's ":gzip"/":br" suffix) and expect an empty 304.
+# Exits 1 when a response has no ETag or revalidating it returns the full body again.
+# Run from the project root: python -m benchmarks.revalidation
+from benchmarks.callbacks import load_app
+
+# Responses that promise ETag revalidation: the app shell and assets linked without a fingerprint
+REVALIDATED_PATHS = ('/_dash-layout', '/assets/style.css', '/assets/clientside.js')
+
+ENCODINGS = ('br', 'gzip', 'identity')
+
+
+def revalidate(client, path, encoding):
+    first = client.get(path, headers={'Accept-Encoding': encoding})
+    etag = first.headers.get('ETag')
+    if first.status_code != 200 or etag is None:
+        return first.status_code, etag, None
+    second = client.get(path, headers={'Accept-Encoding': encoding, 'If-None-Match': etag})
+    return first.status_code, etag, second.status_code
+
+
+def main():
+    app = load_app()
+    client = app.server.test_client()
+    # The index page starts the session and primes the layout the way a first visit does
+    client.get('/')
+
+    failures = []
+    print(f"{'path':<30} {'encoding':<9} {'etag':<52} {'revalidated'}")
+    for path in REVALIDATED_PATHS:
+        for encoding in ENCODINGS:
+            status, etag, revalidated = revalidate(client, path, encoding)
+            print(f'{path:<30} {encoding:<9} {str(etag):<52} {revalidated}')
+            if etag is None:
+                failures.append(f'{path} ({encoding}): status {status} without an ETag')
+            elif revalidated != 304:
+                failures.append(f'{path} ({encoding}): revalidating {etag} returned {revalidated}')
+
+    for line in failures:
+        print(f'NOT REVALIDATED {line}')
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
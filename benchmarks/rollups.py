@@ -0,0 +1,52 @@
+# Multi-year range queries: pandas resample of the raw rows vs. reading a precomputed rollup,
+# and appending a day of rows incrementally vs. rebuilding every rollup
+# Run from the project root: python -m benchmarks.rollups
+import argparse
+
+from benchmarks.timeseries_slice import best_of, make_frame
+from utils.rollups import RollupStore
+from utils.timeseries import TimeSeriesStore
+
+APPEND_ROWS = 24 * 60
+
+
+def run(sizes, repeat):
+    print(f"{'rows':>12} {'resample (ms)':>14} {'rollup (ms)':>12} {'speedup':>9} "
+          f"{'rebuild (ms)':>13} {'append (ms)':>12} {'speedup':>9}")
+    for n_rows in sizes:
+        df = make_frame(n_rows + repeat * APPEND_ROWS)
+        head, tail = df.iloc[:n_rows], df.iloc[n_rows:]
+        # The whole range at weekly resolution with a 5-95 percentile band
+        start, end = str(head['date'].iloc[0]), str(head['date'].iloc[-1])
+        rollups = RollupStore(TimeSeriesStore.from_frame(head, 'date'))
+        chunks = iter(range(0, len(tail), APPEND_ROWS))
+
+        def resample():
+            weekly = head.set_index('date').loc[start:end, 'value_a'].resample('W-MON', label='left', closed='left')
+            return weekly.mean(), weekly.quantile(0.05), weekly.quantile(0.95)
+
+        def query():
+            return rollups.query('week', start, end, ['value_a'])
+
+        def rebuild():
+            RollupStore(TimeSeriesStore.from_frame(head, 'date'))
+
+        def append():
+            # The next day of rows each run
+            rows = tail.iloc[next(chunks):][:APPEND_ROWS]
+            rollups.append(rows['date'].to_numpy(), {name: rows[name].to_numpy() for name in ('value_a', 'value_b')})
+
+        baseline = best_of(resample, repeat)
+        precomputed = best_of(query, repeat)
+        rebuilt = best_of(rebuild, repeat)
+        appended = best_of(append, repeat)
+        print(f"{n_rows:>12,} {baseline * 1e3:>14.2f} {precomputed * 1e3:>12.4f} {baseline / precomputed:>8.0f}x "
+              f"{rebuilt * 1e3:>13.1f} {appended * 1e3:>12.1f} {rebuilt / appended:>8.0f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,106 @@
+# Cold-start cost of a worker, each sample in a fresh interpreter: import time of app.py
+# (python -X importtime) and the time from launching the interpreter to the first response.
+# Exits 1 when a recorded target is missed or a deferred module is imported at startup.
+# Run from the project root: python -m benchmarks.startup --repeats 5
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Recorded targets in milliseconds (median over --repeats processes); raise them only on purpose
+TARGETS = {
+    'import_ms': 750,
+    'first_response_ms': 800,
+}
+
+# Heavy libraries the pages import on first use; loading one at startup is a regression
+DEFERRED_MODULES = ('pandas', 'plotly.express')
+
+# What a browser's first visit requests before anything is drawn
+FIRST_RESPONSE_PATHS = ('/', '/_dash-layout', '/_dash-dependencies')
+
+FIRST_RESPONSE_SCRIPT = '''
+import sys, time
+from app import app
+client = app.server.test_client()
+for path in sys.argv[1:]:
+    if client.get(path).status_code != 200:
+        raise SystemExit(f'{path} failed')
+print(time.time())
+'''
+
+
+def import_profile():
+    # {module: (self us, cumulative us, depth)} for one `import app` in a fresh interpreter;
+    # depth 1 is imported by app.py itself or by a page module Dash loads while app.py runs
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def first_response_ms():
+    # Launch to the last of FIRST_RESPONSE_PATHS answered, interpreter startup included
+    started = time.time()
+    result = subprocess.run(
+        [sys.executable, '-c', FIRST_RESPONSE_SCRIPT, *FIRST_RESPONSE_PATHS],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return (float(result.stdout.split()[-1]) - started) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help='heaviest imports to list')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    profiles = [import_profile() for _ in range(args.repeats)]
+    import_ms = statistics.median(profile['app'][1] / 1e3 for profile in profiles)
+    response_ms = statistics.median(first_response_ms() for _ in range(args.repeats))
+    loaded = [name for name in DEFERRED_MODULES if name in profiles[0]]
+
+    print(f"{'heaviest imports':<40} {'cumulative ms':>14}")
+    heaviest = sorted(
+        ((name, cumulative) for name, (_, cumulative, depth) in profiles[0].items() if depth == 1),
+        key=lambda item: item[1], reverse=True
+    )
+    for name, cumulative in heaviest[:args.top]:
+        print(f'{name:<40} {cumulative / 1e3:>14.1f}')
+
+    results = {'import_ms': import_ms, 'first_response_ms': response_ms}
+    print()
+    failures = []
+    for metric, value in results.items():
+        ok = value <= TARGETS[metric]
+        print(f"{metric:<20} {value:>8.1f} ms  (target {TARGETS[metric]} ms)  {'ok' if ok else 'FAIL'}")
+        if not ok:
+            failures.append(f'{metric} {value:.1f} ms > {TARGETS[metric]} ms')
+    failures.extend(f'{name} is imported at startup' for name in loaded)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({**results, 'targets': TARGETS, 'deferred_loaded': loaded}, f, indent=2)
+
+    for line in failures:
+        print(f'STARTUP REGRESSION {line}')
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# Range-query latency: boolean mask + copy vs. searchsorted slicing
+# Run from the project root: python -m benchmarks.timeseries_slice
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.timeseries import TimeSeriesStore
+
+
+def make_frame(n_rows):
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'date': pd.date_range(start='2000-01-01', periods=n_rows, freq='min'),
+        'value_a': np.cumsum(rng.normal(0, 1, n_rows)),
+        'value_b': np.cumsum(rng.normal(0, 2, n_rows))
+    })
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(sizes, repeat):
+    print(f"{'rows':>12} {'mask+copy (ms)':>16} {'searchsorted (ms)':>18} {'speedup':>9}")
+    for n_rows in sizes:
+        df = make_frame(n_rows)
+        store = TimeSeriesStore.from_frame(df, 'date')
+        # Query the middle half of the series
+        start = str(df['date'].iloc[n_rows // 4])
+        end = str(df['date'].iloc[3 * n_rows // 4])
+
+        def mask_and_copy():
+            return df[(df['date'] >= start) & (df['date'] <= end)].copy()
+
+        def sorted_slice():
+            return store.slice(start, end)
+
+        baseline = best_of(mask_and_copy, repeat)
+        indexed = best_of(sorted_slice, repeat)
+        print(f"{n_rows:>12,} {baseline * 1e3:>16.3f} {indexed * 1e3:>18.4f} {baseline / indexed:>8.0f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,27 @@
+# Production server settings: gunicorn -c gunicorn.conf.py app:server
+# Every value can be overridden through the environment (see utils/config.py).
+from utils.config import PRELOAD_DATASETS, WEB_BIND, WEB_CONCURRENCY, WEB_THREADS, WEB_TIMEOUT
+
+wsgi_app = 'app:server'
+bind = WEB_BIND
+workers = WEB_CONCURRENCY
+threads = WEB_THREADS
+worker_class = 'gthread'
+timeout = WEB_TIMEOUT
+
+# Import app.py, the page modules and (optionally) the datasets once in the master;
+# forked workers then share that memory copy-on-write
+preload_app = True
+
+# The dev tools, hot reload and props checking are only enabled by app.run_server(debug=True),
+# which is never called under gunicorn
+reload = False
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before workers are forked
+    if PRELOAD_DATASETS:
+        from utils.datasets import dataset_registry, preload_datasets
+
+        preload_datasets()
+        server.log.info('Preloaded datasets: %s', ', '.join(dataset_registry))
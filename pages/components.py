@@ -1,10 +1,71 @@
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, clientside_callback, ctx, ClientsideFunction, Input, Output, State, MATCH, ALL
 import dash_bootstrap_components as dbc
 
+from utils.budgets import budget
+from utils.config import CLIENTSIDE_CALLBACKS, UPLOAD_CHUNK_BYTES
+from utils.uploads import UPLOAD_TARGETS, read_status
+
 # Register this page in the app
 dash.register_page(__name__, name="UIコンポーネント", order=1)
 
+# (column title, card text, float side) of each form in the framework comparison
+COMPARISON_FORMS = [
+    ("Bootstrap実装", "これはカードの内容です。Bootstrap UIを使っています。", "left"),
+    ("Dash Bootstrap実装（右側）", "これはカードの内容です。Dash Bootstrap UIを使っています。", "right"),
+]
+
+def comparison_form(index, title, card_text, side):
+    # Dict IDs, so any number of forms is served by one MATCH callback
+    return html.Div([
+        html.H3(title, style={"textAlign": "center"}),
+        html.Hr(),
+        
+        # Card with title, text and button
+        dbc.Card([
+            dbc.CardHeader("カードの例"),
+            dbc.CardBody([
+                html.H5("カードタイトル", className="card-title"),
+                html.P(card_text, className="card-text"),
+                dbc.Button("ボタン", color="primary", id={"type": "bs-card-button", "index": index})
+            ])
+        ], className="mb-4"),
+        
+        # Form elements
+        dbc.Form([
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("テキスト入力"),
+                    dbc.Input(type="text", placeholder="テキストを入力...", id={"type": "bs-text-input", "index": index})
+                ], className="mb-3"),
+            ]),
+            
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("セレクト"),
+                    dbc.Select(
+                        id={"type": "bs-select", "index": index},
+                        options=[
+                            {"label": "オプション 1", "value": "1"},
+                            {"label": "オプション 2", "value": "2"},
+                            {"label": "オプション 3", "value": "3"},
+                        ],
+                        value="1"
+                    )
+                ], className="mb-3"),
+            ]),
+            
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("チェックボックス"),
+                    dbc.Checkbox(id={"type": "bs-checkbox", "index": index}, label="同意する", value=False)
+                ], className="mb-3"),
+            ]),
+            
+            dbc.Button("送信", color="success", id={"type": "bs-submit", "index": index})
+        ])
+    ], style={"width": "48%", "float": side})
+
 # Define the layout for this page
 layout = html.Div([
     html.Div([
@@ -135,13 +196,26 @@ layout = html.Div([
                 style={'width': '100%', 'height': 100, 'marginBottom': '20px'}
             ),
             
-            html.Label("ファイルアップロード"),
-            dcc.Upload(
-                id='upload-demo',
+            html.Label("ファイルアップロード（CSV / Parquet）"),
+            html.P(
+                "ファイルは分割してサーバーへ送信され、読み込んだデータでデータ可視化ページのグラフが置き換わります。",
+                style={'fontSize': '0.9em', 'color': '#666'}
+            ),
+            dcc.Dropdown(
+                id='chunked-upload-target',
+                options=[{'label': target['label'], 'value': name} for name, target in UPLOAD_TARGETS.items()],
+                value='scatter',
+                clearable=False,
+                style={'marginBottom': '10px'}
+            ),
+            # assets/uploads.js sends the chosen or dropped file in UPLOAD_CHUNK_BYTES slices
+            html.Div(
+                id='chunked-upload-drop',
                 children=html.Div([
                     'ドラッグアンドドロップまたは ',
                     html.A('ファイル選択')
                 ]),
+                n_clicks=0,
                 style={
                     'width': '100%',
                     'height': '60px',
@@ -150,10 +224,16 @@ layout = html.Div([
                     'borderStyle': 'dashed',
                     'borderRadius': '5px',
                     'textAlign': 'center',
-                    'marginBottom': '20px'
+                    'cursor': 'pointer',
+                    'marginBottom': '10px'
                 },
-                multiple=True
+                **{'data-chunk-size': str(UPLOAD_CHUNK_BYTES)}
             ),
+            html.Progress(id='chunked-upload-progress', value='0', max='100',
+                          style={'width': '100%', 'display': 'none'}),
+            html.Div(id='chunked-upload-status', style={'marginBottom': '20px'}),
+            dcc.Store(id='chunked-upload-id'),
+            dcc.Interval(id='chunked-upload-interval', interval=500, disabled=True),
             
             html.Button('送信', id='submit-button-demo', n_clicks=0,
                       style={'marginTop': '10px', 'padding': '10px 20px'})
@@ -171,108 +251,13 @@ layout = html.Div([
         html.H2("UIフレームワーク比較", className="card-title"),
         html.P("同じUIを異なるスタイルのBootstrapで実装した比較です。"),
         
-        # Two-column layout for comparison
+        # Two-column layout for comparison; every form shares the pattern-matching callbacks below
         html.Div([
-            # Left column - Bootstrap
-            html.Div([
-                html.H3("Bootstrap実装", style={"textAlign": "center"}),
-                html.Hr(),
-                
-                # Card with title, text and button
-                dbc.Card([
-                    dbc.CardHeader("カードの例"),
-                    dbc.CardBody([
-                        html.H5("カードタイトル", className="card-title"),
-                        html.P("これはカードの内容です。Bootstrap UIを使っています。", className="card-text"),
-                        dbc.Button("ボタン", color="primary", id="bs-card-button")
-                    ])
-                ], className="mb-4"),
-                
-                # Form elements
-                dbc.Form([
-                    dbc.Row([
-                        dbc.Col([
-                            dbc.Label("テキスト入力"),
-                            dbc.Input(type="text", placeholder="テキストを入力...", id="bs-text-input")
-                        ], className="mb-3"),
-                    ]),
-                    
-                    dbc.Row([
-                        dbc.Col([
-                            dbc.Label("セレクト"),
-                            dbc.Select(
-                                id="bs-select",
-                                options=[
-                                    {"label": "オプション 1", "value": "1"},
-                                    {"label": "オプション 2", "value": "2"},
-                                    {"label": "オプション 3", "value": "3"},
-                                ],
-                                value="1"
-                            )
-                        ], className="mb-3"),
-                    ]),
-                    
-                    dbc.Row([
-                        dbc.Col([
-                            dbc.Label("チェックボックス"),
-                            dbc.Checkbox(id="bs-checkbox", label="同意する", value=False)
-                        ], className="mb-3"),
-                    ]),
-                    
-                    dbc.Button("送信", color="success", id="bs-submit")
-                ])
-            ], style={"width": "48%", "float": "left"}),
-            
-            # Right column - Dash Bootstrap
-            html.Div([
-                html.H3("Dash Bootstrap実装（右側）", style={"textAlign": "center"}),
-                html.Hr(),
-                
-                # Card with title, text and button
-                dbc.Card([
-                    dbc.CardHeader("カードの例"),
-                    dbc.CardBody([
-                        html.H5("カードタイトル", className="card-title"),
-                        html.P("これはカードの内容です。Dash Bootstrap UIを使っています。", className="card-text"),
-                        dbc.Button("ボタン", color="primary", id="bs-card-button-2")
-                    ])
-                ], className="mb-4"),
-                
-                # Form elements
-                dbc.Form([
-                    dbc.Row([
-                        dbc.Col([
-                            dbc.Label("テキスト入力"),
-                            dbc.Input(type="text", placeholder="テキストを入力...", id="bs-text-input-2")
-                        ], className="mb-3"),
-                    ]),
-                    
-                    dbc.Row([
-                        dbc.Col([
-                            dbc.Label("セレクト"),
-                            dbc.Select(
-                                id="bs-select-2",
-                                options=[
-                                    {"label": "オプション 1", "value": "1"},
-                                    {"label": "オプション 2", "value": "2"},
-                                    {"label": "オプション 3", "value": "3"},
-                                ],
-                                value="1"
-                            )
-                        ], className="mb-3"),
-                    ]),
-                    
-                    dbc.Row([
-                        dbc.Col([
-                            dbc.Label("チェックボックス"),
-                            dbc.Checkbox(id="bs-checkbox-2", label="同意する", value=False)
-                        ], className="mb-3"),
-                    ]),
-                    
-                    dbc.Button("送信", color="success", id="bs-submit-2")
-                ])
-            ], style={"width": "48%", "float": "right"})
-        ], style={"display": "flex", "justifyContent": "space-between"})
+            comparison_form(index, title, text, side)
+            for index, (title, text, side) in enumerate(COMPARISON_FORMS, start=1)
+        ], style={"display": "flex", "justifyContent": "space-between"}),
+        
+        html.Div(id='bs-submit-summary', style={"marginTop": "20px"})
     ], className="card")
 ])
 
@@ -286,6 +271,7 @@ layout = html.Div([
     State('checklist-demo', 'value'),
     prevent_initial_call=True
 )
+@budget(max_bytes=1_000, max_p50_ms=10)
 def update_demo_output(n_clicks, text_value, dropdown_value, slider_value, checklist_value):
     if n_clicks == 0:
         return "コンポーネントの値を表示するには送信を押してください。"
@@ -298,26 +284,93 @@ def update_demo_output(n_clicks, text_value, dropdown_value, slider_value, check
         html.P(f"チェックリスト選択: {checklist_value}")
     ])
 
-# Callback for Bootstrap form submission
-@callback(
-    Output('bs-submit', 'children'),
-    Input('bs-submit', 'n_clicks'),
-    State('bs-text-input', 'value'),
-    State('bs-select', 'value'),
-    State('bs-checkbox', 'value'),
+# The browser picks the file and streams it; this only hands back a new upload id
+clientside_callback(
+    ClientsideFunction(namespace='uploads', function_name='start'),
+    Output('chunked-upload-id', 'data'),
+    Input('chunked-upload-drop', 'n_clicks'),
+    State('chunked-upload-target', 'value'),
     prevent_initial_call=True
 )
-def bs_form_submit(n_clicks, text, select, checkbox):
-    return f"送信済み ({n_clicks})"
 
-# Callback for Bootstrap form submission (right side)
+# Give up polling if no file was chosen within this many ticks of starting the upload
+UPLOAD_WAIT_TICKS = 240
+
+# Poll the server-side status of the current upload until it finishes. A new upload restarts
+# the interval's tick count, so the wait limit applies to each upload, not to the page.
 @callback(
-    Output('bs-submit-2', 'children'),
-    Input('bs-submit-2', 'n_clicks'),
-    State('bs-text-input-2', 'value'),
-    State('bs-select-2', 'value'),
-    State('bs-checkbox-2', 'value'),
+    Output('chunked-upload-progress', 'value'),
+    Output('chunked-upload-progress', 'style'),
+    Output('chunked-upload-status', 'children'),
+    Output('chunked-upload-interval', 'disabled'),
+    Output('chunked-upload-interval', 'n_intervals'),
+    Input('chunked-upload-id', 'data'),
+    Input('chunked-upload-interval', 'n_intervals'),
     prevent_initial_call=True
 )
-def bs_form_submit_2(n_clicks, text, select, checkbox):
-    return f"送信済み ({n_clicks})"
\ No newline at end of file
+@budget(max_bytes=1_000, max_p50_ms=10)
+def update_upload_progress(upload_id, n_intervals):
+    if ctx.triggered_id == 'chunked-upload-id':
+        return (*upload_progress(upload_id, 0), 0)
+    return (*upload_progress(upload_id, n_intervals), dash.no_update)
+
+def upload_progress(upload_id, n_intervals):
+    status = read_status(upload_id)
+    state = status['state']
+    style = {'width': '100%', 'display': 'block'}
+
+    if state == 'waiting':
+        return '0', {'display': 'none'}, 'ファイルを選択してください', (n_intervals or 0) > UPLOAD_WAIT_TICKS
+    if state == 'receiving':
+        percent = 100 * status['received'] / max(status['total'], 1)
+        return (str(round(percent)), style,
+                f"{status['filename']} を送信中 ... {status['received'] / 1024 ** 2:.1f} / {status['total'] / 1024 ** 2:.1f} MB",
+                False)
+    if state == 'parsing':
+        return '100', style, f"{status['filename']} を読み込み中 ... {status['rows']:,} 行", False
+    if state == 'done':
+        return ('100', style, [
+            f"{status['filename']} ({status['rows']:,} 行) を読み込みました。",
+            dcc.Link('データ可視化ページで確認', href='/data-visualization')
+        ], True)
+    return '0', {'display': 'none'}, f"アップロードに失敗しました: {status.get('message', '')}", True
+
+# Callback for Bootstrap form submission, shared by every comparison form
+@budget(max_bytes=500, max_p50_ms=10)
+def bs_form_submit(n_clicks, text, select, checkbox):
+    return f"送信済み ({n_clicks})"
+
+@budget(max_bytes=500, max_p50_ms=10)
+def bs_submit_summary(n_clicks):
+    return f"全フォームの送信回数: {sum(n or 0 for n in n_clicks)}"
+
+# The submit buttons only echo their click count, so they run clientside when enabled
+if CLIENTSIDE_CALLBACKS:
+    clientside_callback(
+        ClientsideFunction(namespace='components', function_name='formSubmitted'),
+        Output({'type': 'bs-submit', 'index': MATCH}, 'children'),
+        Input({'type': 'bs-submit', 'index': MATCH}, 'n_clicks'),
+        prevent_initial_call=True
+    )
+    
+    clientside_callback(
+        ClientsideFunction(namespace='components', function_name='submitSummary'),
+        Output('bs-submit-summary', 'children'),
+        Input({'type': 'bs-submit', 'index': ALL}, 'n_clicks'),
+        prevent_initial_call=True
+    )
+else:
+    callback(
+        Output({'type': 'bs-submit', 'index': MATCH}, 'children'),
+        Input({'type': 'bs-submit', 'index': MATCH}, 'n_clicks'),
+        State({'type': 'bs-text-input', 'index': MATCH}, 'value'),
+        State({'type': 'bs-select', 'index': MATCH}, 'value'),
+        State({'type': 'bs-checkbox', 'index': MATCH}, 'value'),
+        prevent_initial_call=True
+    )(bs_form_submit)
+    
+    callback(
+        Output('bs-submit-summary', 'children'),
+        Input({'type': 'bs-submit', 'index': ALL}, 'n_clicks'),
+        prevent_initial_call=True
+    )(bs_submit_summary)
@@ -1,10 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import dash
-from dash import html, dcc, callback, Input, Output
-import pandas as pd
-import numpy as np
-import plotly.express as px
+from dash.exceptions import PreventUpdate
+from dash import html, dcc, callback, clientside_callback, ctx, ClientsideFunction, Input, Output, Patch, State
+# plotly loads graph_objects classes on first use; numpy, pandas and plotly.express are imported
+# inside the functions that need them, so starting a worker does not pay for them
 import plotly.graph_objects as go
 
+from utils.config import (
+    BINARY_FIGURE_ARRAYS, CLIENTSIDE_CALLBACKS, CLOUD_VOXEL_THRESHOLD, DENSITY_BINS, FIGURE_CACHE_DISK,
+    FIGURE_CACHE_MEMORY_BYTES, FIGURE_CACHE_WARM, LIVE_CAPACITY, LIVE_MAX_POINTS, LIVE_PERIOD_MS,
+    SCATTER_DENSITY_THRESHOLD, SCATTER_WEBGL_THRESHOLD, TIMESERIES_BACKGROUND_ROWS, VOXEL_GRID
+)
+from utils.background import background_callback, background_manager, progress_reporter
+from utils.budgets import budget
+from utils.datasets import get_dataset, on_datasets_reloaded, register_dataset
+from utils.figure_cache import FigureCache, data_version
+from utils.sample_data import sample_loader
+from utils.serialization import encode_typed_arrays
+from utils import sessions
+
 # Register this page in the app
 dash.register_page(
     __name__, 
@@ -13,231 +28,614 @@ dash.register_page(
     order=2
 )
 
-# Generate sample data
-np.random.seed(42)
-
-# Time series data
-dates = pd.date_range(start='2023-01-01', periods=100, freq='D')
-time_series_df = pd.DataFrame({
-    'date': dates,
-    'value_a': np.cumsum(np.random.normal(0, 1, 100)),
-    'value_b': np.cumsum(np.random.normal(0, 2, 100))
-})
-
-# Scatter data
-scatter_df = pd.DataFrame({
-    'x': np.random.normal(0, 1, 200),
-    'y': np.random.normal(0, 1, 200),
-    'size': np.random.uniform(5, 25, 200),
-    'category': np.random.choice(['A', 'B', 'C', 'D'], 200)
-})
-
-# Bar chart data
-categories = ['Category A', 'Category B', 'Category C', 'Category D', 'Category E']
-bar_df = pd.DataFrame({
-    'category': categories,
-    'value': np.random.randint(10, 100, len(categories))
-})
-
-# 3D data
-n_points = 500
-theta = np.random.uniform(0, 2*np.pi, n_points)
-phi = np.random.uniform(0, np.pi, n_points)
-r = np.random.normal(5, 1, n_points)
-
-x = r * np.sin(phi) * np.cos(theta)
-y = r * np.sin(phi) * np.sin(theta)
-z = r * np.cos(phi)
-
-three_d_df = pd.DataFrame({
-    'x': x,
-    'y': y,
-    'z': z,
-    'group': np.random.choice(['Group 1', 'Group 2', 'Group 3'], n_points)
-})
-
-# Define the layout for this page
-layout = html.Div([
-    html.Div([
-        html.H2("Dashでのデータ可視化", className="card-title"),
-        html.P("このページでは、DashとNumPyやPlotlyなどのデータ分析ライブラリとの連携方法を紹介します。"),
-    ], className="card"),
+# Datasets load on first use; files in DASH_DATA_DIR take precedence over the synthetic data
+register_dataset('time_series', fallback=sample_loader('time_series'))
+register_dataset('scatter', fallback=sample_loader('scatter'), categories=['category'])
+register_dataset('bar', fallback=sample_loader('bar'))
+register_dataset('three_d', fallback=sample_loader('three_d'), categories=['group'])
+
+# Loaders of the derived datasets; the numpy-based modules behind them are imported on first use
+def time_series_store():
+    from utils.timeseries import TimeSeriesStore
+
+    return TimeSeriesStore.from_frame(get_dataset('time_series'), 'date')
+
+def time_series_rollups():
+    from utils.rollups import RollupStore
+
+    return RollupStore(get_dataset('time_series_store'), [column for column, _ in TIMESERIES_TRACES])
+
+def group_index(dataset, column):
+    def load():
+        from utils.groups import GroupIndex
+
+        return GroupIndex.from_frame(get_dataset(dataset), column)
+    return load
+
+def live_feed():
+    from utils.live import SimulatedFeed
+
+    return SimulatedFeed(LIVE_CAPACITY, LIVE_PERIOD_MS)
+
+register_dataset('time_series_store', loader=time_series_store)
+# Per-day/week/month/quarter mean, min/max and 5th/95th percentiles, so long ranges read buckets instead of rows
+register_dataset('time_series_rollups', loader=time_series_rollups)
+# Row positions per category / group, so the filters below gather rows instead of comparing strings
+register_dataset('scatter_groups', loader=group_index('scatter', 'category'))
+# Simulated live feed behind the real-time chart; a fixed-capacity ring buffer per worker
+register_dataset('live_feed', loader=live_feed)
+register_dataset('three_d_groups', loader=group_index('three_d', 'group'))
+
+# Figure cache shared by the filter/sort callbacks; the data version is part of every key
+figure_cache = FigureCache(
+    'data_visualization',
+    version=lambda: data_version(
+        get_dataset('time_series'), get_dataset('scatter'), get_dataset('bar'), get_dataset('three_d')
+    ),
+    max_memory_bytes=FIGURE_CACHE_MEMORY_BYTES,
+    use_disk=FIGURE_CACHE_DISK
+)
+
+# An upload replaced a dataset (utils/uploads.py): recompute the data version on next use
+on_datasets_reloaded(figure_cache.invalidate_version)
+
+# Define the layout for this page; it is a function so the datasets load on the first visit.
+# Dash passes the query string as keyword arguments, which this page ignores
+def layout(**_query):
+    scatter_groups = get_dataset('scatter_groups')
+    three_d_groups = get_dataset('three_d_groups')
+    start_date, end_date = time_series_bounds()
+    figures = default_figures(start_date, end_date)
+    live_chart, live_cursor = live_figure()
     
-    # Time Series Visualization
-    html.Div([
-        html.H2("時系列可視化", className="card-title"),
-        html.P("この例では、PlotlyとDashを使用してインタラクティブな時系列チャートを作成する方法を紹介します。"),
+    return html.Div([
+        # Columnar copies of the page's data for the clientside callbacks
+        html.Div([
+            html.H2("Dashでのデータ可視化", className="card-title"),
+            html.P("このページでは、DashとNumPyやPlotlyなどのデータ分析ライブラリとの連携方法を紹介します。"),
+        ], className="card"),
         
+        # Time Series Visualization
         html.Div([
-            html.Label("変数を選択："),
-            dcc.Checklist(
-                id='timeseries-checklist',
-                options=[
-                    {'label': ' 値 A', 'value': 'value_a'},
-                    {'label': ' 値 B', 'value': 'value_b'}
-                ],
-                value=['value_a', 'value_b'],
-                inline=True,
-                style={'marginBottom': '10px'}
-            ),
-            
-            html.Label("日付範囲："),
-            dcc.DatePickerRange(
-                id='date-picker-range',
-                start_date=time_series_df['date'].min(),
-                end_date=time_series_df['date'].max(),
-                style={'marginBottom': '20px'}
-            ),
-            
-            dcc.Graph(id='time-series-chart')
-        ])
-    ], className="card"),
-    
-    # Scatter Plot with Filtering
-    html.Div([
-        html.H2("インタラクティブな散布図", className="card-title"),
-        html.P("この例では、フィルタリング機能を持つ散布図を紹介します。"),
+            html.H2("時系列可視化", className="card-title"),
+            html.P("この例では、PlotlyとDashを使用してインタラクティブな時系列チャートを作成する方法を紹介します。"),
+        
+            html.Div([
+                html.Label("変数を選択："),
+                dcc.Checklist(
+                    id='timeseries-checklist',
+                    options=[
+                        {'label': ' 値 A', 'value': 'value_a'},
+                        {'label': ' 値 B', 'value': 'value_b'}
+                    ],
+                    value=['value_a', 'value_b'],
+                    inline=True,
+                    style={'marginBottom': '10px'}
+                ),
+        
+                html.Label("日付範囲："),
+                dcc.DatePickerRange(
+                    id='date-picker-range',
+                    start_date=start_date,
+                    end_date=end_date,
+                    style={'marginBottom': '10px'}
+                ),
+        
+                html.Label("間引き方法："),
+                dcc.RadioItems(
+                    id='timeseries-downsample-method',
+                    options=[
+                        {'label': ' LTTB', 'value': 'lttb'},
+                        {'label': ' 区間ごとの最小・最大', 'value': 'minmax'}
+                    ],
+                    value='lttb',
+                    inline=True,
+                    style={'marginBottom': '10px'}
+                ),
+        
+                html.Label("集計の粒度："),
+                dcc.Dropdown(
+                    id='timeseries-resolution',
+                    options=[
+                        {'label': '自動（範囲に合わせて選択）', 'value': 'auto'},
+                        *({'label': label, 'value': value} for value, label in TIMESERIES_RESOLUTIONS.items())
+                    ],
+                    value='auto',
+                    clearable=False,
+                    style={'marginBottom': '10px'}
+                ),
+        
+                html.Label("集計時の帯："),
+                dcc.RadioItems(
+                    id='timeseries-band',
+                    options=[
+                        {'label': ' なし', 'value': 'none'},
+                        {'label': ' 最小〜最大', 'value': 'minmax'},
+                        {'label': ' 5〜95パーセンタイル', 'value': 'p5p95'}
+                    ],
+                    value='minmax',
+                    inline=True,
+                    style={'marginBottom': '20px'}
+                ),
+        
+                dcc.Graph(id='time-series-chart', figure=figures['time-series-chart']),
+                # Arguments of a slice too large to answer inline, and a tick per inline answer
+                dcc.Store(id='timeseries-job'),
+                dcc.Store(id='timeseries-rendered', data=0),
+                background_job_controls('timeseries')
+            ])
+        ], className="card"),
         
+        # Live Time Series
         html.Div([
-            html.Label("カテゴリを選択："),
-            dcc.Dropdown(
-                id='scatter-category-filter',
-                options=[{'label': cat, 'value': cat} for cat in scatter_df['category'].unique()],
-                value=None,
-                placeholder="すべてのカテゴリ",
-                style={'marginBottom': '20px'}
-            ),
-            
-            dcc.Graph(id='scatter-plot')
-        ])
-    ], className="card"),
-    
-    # 3D Visualization
-    html.Div([
-        html.H2("3D可視化", className="card-title"),
-        html.P("この例では、Plotlyを使用してインタラクティブな3D可視化を作成する方法を紹介します。"),
+            html.H2("リアルタイム時系列", className="card-title"),
+            html.P("この例では、dcc.IntervalとextendDataを使って新しい点だけを送信するリアルタイムチャートを紹介します。"),
+        
+            html.Div([
+                dcc.Graph(id='live-chart', figure=live_chart),
+                # Sequence number of the next point the browser has not received
+                dcc.Store(id='live-cursor', data=live_cursor),
+                dcc.Interval(id='live-interval', interval=LIVE_PERIOD_MS)
+            ])
+        ], className="card"),
         
+        # Scatter Plot with Filtering
         html.Div([
-            html.Label("グループを選択："),
-            dcc.Dropdown(
-                id='3d-group-filter',
-                options=[
-                    {'label': 'すべてのグループ', 'value': 'all'},
-                    *[{'label': group, 'value': group} for group in three_d_df['group'].unique()]
-                ],
-                value='all',
-                style={'marginBottom': '20px'}
-            ),
-            
-            dcc.Graph(id='3d-scatter')
-        ])
-    ], className="card"),
-    
-    # Bar Chart with Sorting
-    html.Div([
-        html.H2("ソート機能付き棒グラフ", className="card-title"),
-        html.P("この例では、ソートオプション付きの棒グラフを紹介します。"),
+            html.H2("インタラクティブな散布図", className="card-title"),
+            html.P("この例では、フィルタリング機能を持つ散布図を紹介します。"),
+        
+            html.Div([
+                html.Label("カテゴリを選択："),
+                dcc.Dropdown(
+                    id='scatter-category-filter',
+                    options=[{'label': cat, 'value': cat} for cat in scatter_groups.categories],
+                    value=None,
+                    multi=True,
+                    placeholder="すべてのカテゴリ",
+                    style={'marginBottom': '20px'}
+                ),
+        
+                dcc.Graph(id='scatter-plot', figure=figures['scatter-plot']),
+                
+                # The filtered rows stay in the server-side session store; this holds only a handle
+                dcc.Store(id='scatter-selection'),
+                html.Div(scatter_summary(selected_scatter_frame(None)), id='scatter-summary'),
+                html.Button('選択中のデータをCSVでダウンロード', id='scatter-download-button', n_clicks=0),
+                dcc.Download(id='scatter-download')
+            ])
+        ], className="card"),
+        
+        # 3D Visualization
+        html.Div([
+            html.H2("3D可視化", className="card-title"),
+            html.P("この例では、Plotlyを使用してインタラクティブな3D可視化を作成する方法を紹介します。"),
         
+            html.Div([
+                html.Label("グループを選択："),
+                dcc.Dropdown(
+                    id='3d-group-filter',
+                    options=[
+                        {'label': 'すべてのグループ', 'value': 'all'},
+                        *[{'label': group, 'value': group} for group in three_d_groups.categories]
+                    ],
+                    value='all',
+                    clearable=False,
+                    style={'marginBottom': '20px'}
+                ),
+        
+                dcc.Graph(id='3d-scatter', figure=figures['3d-scatter']),
+                background_job_controls('3d-scatter')
+            ])
+        ], className="card"),
+        
+        # Bar Chart with Sorting
         html.Div([
-            html.Label("並び替え順："),
-            dcc.RadioItems(
-                id='bar-sort-order',
-                options=[
-                    {'label': ' アルファベット順', 'value': 'alphabetical'},
-                    {'label': ' 値の昇順', 'value': 'ascending'},
-                    {'label': ' 値の降順', 'value': 'descending'}
-                ],
-                value='alphabetical',
-                inline=True,
-                style={'marginBottom': '20px'}
-            ),
-            
-            dcc.Graph(id='bar-chart')
-        ])
-    ], className="card")
-])
+            html.H2("ソート機能付き棒グラフ", className="card-title"),
+            html.P("この例では、ソートオプション付きの棒グラフを紹介します。"),
+        
+            html.Div([
+                html.Label("並び替え順："),
+                dcc.RadioItems(
+                    id='bar-sort-order',
+                    options=[
+                        {'label': ' アルファベット順', 'value': 'alphabetical'},
+                        {'label': ' 値の昇順', 'value': 'ascending'},
+                        {'label': ' 値の降順', 'value': 'descending'}
+                    ],
+                    value='alphabetical',
+                    inline=True,
+                    style={'marginBottom': '20px'}
+                ),
+        
+                dcc.Graph(id='bar-chart', figure=figures['bar-chart'])
+            ])
+        ], className="card")
+    ])
 
-# Callbacks for interactive visualizations
-@callback(
-    Output('time-series-chart', 'figure'),
-    Input('timeseries-checklist', 'value'),
-    Input('date-picker-range', 'start_date'),
-    Input('date-picker-range', 'end_date')
-)
-def update_timeseries(selected_values, start_date, end_date):
-    if not selected_values:
-        return px.line(title="少なくとも1つの変数を選択してください")
+def background_job_controls(prefix):
+    # Progress bar and cancel button, shown while the chart's background callback runs
+    return html.Div([
+        html.Progress(id=f'{prefix}-progress', value='0', max='1', style={'flex': '1', 'marginRight': '10px'}),
+        html.Button('キャンセル', id=f'{prefix}-cancel', n_clicks=0)
+    ], id=f'{prefix}-job', style={'display': 'none'})
+
+def background_job_options(prefix, *cancel):
+    return dict(
+        progress=[Output(f'{prefix}-progress', 'value'), Output(f'{prefix}-progress', 'max')],
+        progress_default=['0', '1'],
+        running=[(Output(f'{prefix}-job', 'style'), {'display': 'flex', 'alignItems': 'center'}, {'display': 'none'})],
+        # A new trigger also cancels the running job; the button (or an extra cancel input) stops it explicitly
+        cancel=[Input(f'{prefix}-cancel', 'n_clicks'), *cancel]
+    )
+
+def numeric_figure(fig):
+    # Point-heavy figures go out as base64 typed arrays when the client supports them
+    return encode_typed_arrays(fig, float32=True) if BINARY_FIGURE_ARRAYS else fig
+
+def labelled_frame(df, column):
+    # plotly.express groups a categorical column by every category, including ones the filter
+    # removed, so the (already filtered) frame is handed over with plain string labels
+    return df.assign(**{column: df[column].astype(str)})
+
+# Trace order of the time-series figure; patches address traces by this position.
+# The line traces come first, then a lower and an upper band trace per variable.
+TIMESERIES_TRACES = [('value_a', '値 A'), ('value_b', '値 B')]
+TIMESERIES_COLORS = {'value_a': '#636efa', 'value_b': '#ef553b'}
+TIMESERIES_TITLE = '時系列データ'
+TIMESERIES_RESOLUTIONS = {'raw': '元データ', 'day': '日', 'week': '週', 'month': '月', 'quarter': '四半期'}
+TIMESERIES_BANDS = {'minmax': ('min', 'max'), 'p5p95': ('p5', 'p95')}
+EMPTY_SELECTION_TITLE = "少なくとも1つの変数を選択してください"
+
+def time_series_bounds():
+    # First and last day of the time series as ISO dates, the date picker's defaults
+    import numpy as np
+
+    store = get_dataset('time_series_store')
+    return str(np.datetime_as_string(store.start, unit='D')), str(np.datetime_as_string(store.end, unit='D'))
+
+def timeseries_range(start_date, end_date, window=None, resolution='auto'):
+    # The range and resolution build_timeseries reads: the date-picker range narrowed to the
+    # zoomed window so zooming in refetches at full resolution, and auto resolved to the raw rows
+    # while they fit on the chart, otherwise the finest rollup that does
+    import numpy as np
+    from utils.downsample import DEFAULT_MAX_POINTS
+
+    if window is not None:
+        start_date = max(np.datetime64(start_date, 'ns'), np.datetime64(window[0], 'ns'))
+        end_date = min(np.datetime64(end_date, 'ns'), np.datetime64(window[1], 'ns'))
+    if resolution == 'auto':
+        resolution = get_dataset('time_series_rollups').choose_resolution(start_date, end_date, DEFAULT_MAX_POINTS)
+    return start_date, end_date, resolution
+
+def timeseries_rows(start_date, end_date, window=None, resolution='auto'):
+    # Raw rows build_timeseries slices and downsamples; a rollup reads a few hundred buckets at most
+    start_date, end_date, resolution = timeseries_range(start_date, end_date, window, resolution)
+    if resolution != 'raw':
+        return 0
+    lo, hi = get_dataset('time_series_store').bounds(start_date, end_date)
+    return hi - lo
+
+@figure_cache.memoize
+def build_timeseries(selected_values, start_date, end_date, downsample_method, window=None, resolution='auto',
+                     band='minmax', progress=None):
+    from utils.downsample import DEFAULT_MAX_POINTS, downsample
+
+    title = TIMESERIES_TITLE if selected_values else EMPTY_SELECTION_TITLE
+    start_date, end_date, resolution = timeseries_range(start_date, end_date, window, resolution)
     
-    filtered_df = time_series_df[
-        (time_series_df['date'] >= start_date) & 
-        (time_series_df['date'] <= end_date)
-    ].copy()
+    # Binary search on the sorted index / bucket starts; the slices are views into the stores
+    steps = len(TIMESERIES_TRACES) + 1
+    if resolution == 'raw':
+        dates, values = get_dataset('time_series_store').slice(start_date, end_date)
+    else:
+        dates, stats = get_dataset('time_series_rollups').query(resolution, start_date, end_date)
     
+    # Every variable gets a trace (hidden when unselected) so later toggles can be patched
     fig = go.Figure()
+    bands = []
     
-    if 'value_a' in selected_values:
+    for i, (column, name) in enumerate(TIMESERIES_TRACES):
+        if progress is not None:
+            progress(i + 1, steps)
+        # Band traces stay empty for the raw rows, so the trace positions never change
+        band_x, lower, upper = [], [], []
+        if resolution == 'raw':
+            x, y = downsample(dates, values[column], DEFAULT_MAX_POINTS, downsample_method)
+        else:
+            x, y = dates, stats[column]['mean']
+            if band in TIMESERIES_BANDS:
+                lower_stat, upper_stat = TIMESERIES_BANDS[band]
+                band_x, lower, upper = x, stats[column][lower_stat], stats[column][upper_stat]
+        visible = column in selected_values
         fig.add_trace(go.Scatter(
-            x=filtered_df['date'],
-            y=filtered_df['value_a'],
+            x=x,
+            y=y,
             mode='lines',
-            name='値 A'
-        ))
-    
-    if 'value_b' in selected_values:
-        fig.add_trace(go.Scatter(
-            x=filtered_df['date'],
-            y=filtered_df['value_b'],
-            mode='lines',
-            name='値 B'
+            name=name,
+            line={'color': TIMESERIES_COLORS[column]},
+            legendgroup=column,
+            visible=visible
         ))
+        # The upper edge fills down to the lower one, the trace right before it
+        bands.extend(
+            go.Scatter(
+                x=band_x,
+                y=edge,
+                mode='lines',
+                line={'width': 0, 'color': TIMESERIES_COLORS[column]},
+                fill=fill,
+                opacity=0.25,
+                legendgroup=column,
+                showlegend=False,
+                hoverinfo='skip',
+                visible=visible
+            )
+            for edge, fill in ((lower, None), (upper, 'tonexty'))
+        )
+    fig.add_traces(bands)
     
     fig.update_layout(
-        title='時系列データ',
-        xaxis_title='日付',
+        title=title,
+        xaxis_title='日付' if resolution == 'raw' else f'日付（{TIMESERIES_RESOLUTIONS[resolution]}ごとの平均）',
         yaxis_title='値',
         legend_title='変数',
-        hovermode='x unified'
+        hovermode='x unified',
+        # Keep the user's zoom when the figure is replaced with the refetched window
+        uirevision=f'{start_date}:{end_date}' if window is None else 'zoom'
     )
     
     return fig
 
+# Callbacks for interactive visualizations
+
+# Toggling a variable only flips trace visibility; the data is already in the browser
 @callback(
-    Output('scatter-plot', 'figure'),
-    Input('scatter-category-filter', 'value')
+    Output('time-series-chart', 'figure', allow_duplicate=True),
+    Input('timeseries-checklist', 'value'),
+    prevent_initial_call=True
 )
-def update_scatter(selected_category):
-    filtered_df = scatter_df if selected_category is None else scatter_df[scatter_df['category'] == selected_category]
+@budget(max_bytes=1_000, max_p50_ms=10)
+def toggle_timeseries(selected_values):
+    selected_values = selected_values or []
+    patched_figure = Patch()
+    n = len(TIMESERIES_TRACES)
+    for i, (column, _) in enumerate(TIMESERIES_TRACES):
+        for trace in (i, n + 2 * i, n + 2 * i + 1):
+            patched_figure['data'][trace]['visible'] = column in selected_values
+    patched_figure['layout']['title']['text'] = TIMESERIES_TITLE if selected_values else EMPTY_SELECTION_TITLE
+    return patched_figure
+
+# A slice answers inline when it is cheap (a rollup, a short raw range or a cached figure) and is
+# otherwise handed to render_timeseries_job, so a quick zoom never waits for a job to be polled
+@callback(
+    Output('time-series-chart', 'figure', allow_duplicate=True),
+    Output('timeseries-job', 'data'),
+    Output('timeseries-rendered', 'data'),
+    Input('date-picker-range', 'start_date'),
+    Input('date-picker-range', 'end_date'),
+    Input('timeseries-downsample-method', 'value'),
+    Input('timeseries-resolution', 'value'),
+    Input('timeseries-band', 'value'),
+    Input('time-series-chart', 'relayoutData'),
+    State('timeseries-checklist', 'value'),
+    State('timeseries-rendered', 'data'),
+    prevent_initial_call=True
+)
+@budget(max_bytes=20_000, max_p50_ms=50)
+def update_timeseries(start_date, end_date, downsample_method, resolution, band, relayout_data, selected_values,
+                      rendered):
+    from utils.downsample import changes_range, relayout_window
+
+    # Only a new x range needs the data refetched; anything else would rebuild the full range
+    # and reset the user's zoom
+    zoomed = ctx.triggered_id == 'time-series-chart'
+    if zoomed and not changes_range(relayout_data):
+        raise PreventUpdate
+    
+    # relayoutData keeps the last zoom after other inputs change, so it only counts when it fired;
+    # a new date range, resolution or band shows the whole range (and uirevision resets the axes)
+    window = relayout_window(relayout_data) if zoomed else None
+    args = (selected_values or [], start_date, end_date, downsample_method, window, resolution, band)
+    if (background_manager is not None and figure_cache.lookup(build_timeseries, *args) is None
+            and timeseries_rows(start_date, end_date, window, resolution) > TIMESERIES_BACKGROUND_ROWS):
+        return dash.no_update, args, dash.no_update
+    # The tick cancels a job still slicing an earlier, larger range
+    return build_timeseries(*args), dash.no_update, (rendered or 0) + 1
+
+# Slicing and downsampling a long raw range runs as a background job so it never holds a request worker
+@background_callback(
+    Output('time-series-chart', 'figure'),
+    Input('timeseries-job', 'data'),
+    prevent_initial_call=True,
+    **background_job_options('timeseries', Input('timeseries-rendered', 'data'))
+)
+@budget(max_bytes=20_000, max_p50_ms=50)
+def render_timeseries_job(set_progress, job):
+    if not job:
+        raise PreventUpdate
+    return build_timeseries(*job, progress=progress_reporter(set_progress))
+
+def live_figure():
+    # The newest LIVE_MAX_POINTS points and the cursor the interval callback continues from
+    feed = get_dataset('live_feed')
+    cursor = feed.advance()
+    _, points = feed.buffer.since(cursor - LIVE_MAX_POINTS)
+    fig = go.Figure([
+        go.Scatter(x=points['date'], y=points[column], mode='lines', name=name)
+        for column, name in TIMESERIES_TRACES
+    ])
+    fig.update_layout(
+        title='リアルタイム時系列',
+        xaxis_title='時刻',
+        yaxis_title='値',
+        legend_title='変数',
+        uirevision='live'
+    )
+    return fig, cursor
+
+# Each tick sends only the points added since the last one; maxPoints trims the browser's copy
+@callback(
+    Output('live-chart', 'extendData'),
+    Output('live-cursor', 'data'),
+    Input('live-interval', 'n_intervals'),
+    State('live-cursor', 'data'),
+    prevent_initial_call=True
+)
+@budget(max_bytes=64_000, max_p50_ms=20)
+def extend_live_chart(n_intervals, cursor):
+    feed = get_dataset('live_feed')
+    end = feed.advance()
+    first, points = feed.buffer.since(cursor or 0, limit=LIVE_MAX_POINTS)
+    if first == end:
+        raise PreventUpdate
+    
+    columns = [column for column, _ in TIMESERIES_TRACES]
+    return (
+        {'x': [points['date']] * len(columns), 'y': [points[column] for column in columns]},
+        list(range(len(columns))),
+        LIVE_MAX_POINTS
+    ), end
+
+@figure_cache.memoize
+def build_scatter(selected_categories, x_range=None, y_range=None):
+    import plotly.express as px
+    from utils.rendering import density_grid, scatter_render_mode
+
+    filtered_df = get_dataset('scatter_groups').take(get_dataset('scatter'), selected_categories)
+    label = '' if selected_categories is None else f"カテゴリ {'・'.join(selected_categories)} の"
+    title = f"散布図 {label}"
+    
+    # Too many points to draw: send a density heatmap of the (zoomed) window instead
+    if len(filtered_df) > SCATTER_DENSITY_THRESHOLD:
+        z, x_centers, y_centers = density_grid(filtered_df['x'], filtered_df['y'], DENSITY_BINS, x_range, y_range)
+        fig = go.Figure(go.Heatmap(
+            z=z,
+            x=x_centers,
+            y=y_centers,
+            colorscale='Viridis',
+            colorbar={'title': '点数'},
+            hovertemplate='X値=%{x}<br>Y値=%{y}<br>点数=%{z}<extra></extra>'
+        ))
+        fig.update_layout(
+            title=f"{title}（密度）",
+            xaxis_title='X値',
+            yaxis_title='Y値',
+            uirevision=','.join(selected_categories or ['all'])
+        )
+        return numeric_figure(fig)
     
     fig = px.scatter(
-        filtered_df, 
+        labelled_frame(filtered_df, 'category'), 
         x='x', 
         y='y',
         size='size',
         color='category',
-        title=f"散布図 {'' if selected_category is None else f'カテゴリ {selected_category} の'}",
-        labels={'x': 'X値', 'y': 'Y値', 'size': 'サイズ', 'category': 'カテゴリ'}
+        title=title,
+        labels={'x': 'X値', 'y': 'Y値', 'size': 'サイズ', 'category': 'カテゴリ'},
+        render_mode=scatter_render_mode(len(filtered_df), SCATTER_WEBGL_THRESHOLD)
     )
     
     fig.update_layout(
         transition_duration=500
     )
     
-    return fig
+    return numeric_figure(fig)
 
 @callback(
-    Output('3d-scatter', 'figure'),
-    Input('3d-group-filter', 'value')
+    Output('scatter-plot', 'figure'),
+    Input('scatter-category-filter', 'value'),
+    Input('scatter-plot', 'relayoutData'),
+    prevent_initial_call=True
 )
-def update_3d_scatter(selected_group):
-    filtered_df = three_d_df if selected_group == 'all' else three_d_df[three_d_df['group'] == selected_group]
+@budget(max_bytes=14_000, max_p50_ms=200)
+def update_scatter(selected_categories, relayout_data):
+    # One cache entry per set of categories, whatever order they were picked in
+    selected_categories = sorted(selected_categories) if selected_categories else None
+    if ctx.triggered_id != 'scatter-plot':
+        return build_scatter(selected_categories)
+    
+    from utils.downsample import changes_range, relayout_window
+
+    # Zooming only needs the server when the chart is a density grid: re-bin for the visible window.
+    # Relayout events that leave both axis ranges alone (autosize, legend, dragmode) change nothing.
+    if not (changes_range(relayout_data, 'xaxis') or changes_range(relayout_data, 'yaxis')):
+        raise PreventUpdate
+    if get_dataset('scatter_groups').count(selected_categories) <= SCATTER_DENSITY_THRESHOLD:
+        raise PreventUpdate
     
+    x_range = relayout_window(relayout_data, 'xaxis')
+    y_range = relayout_window(relayout_data, 'yaxis')
+    return build_scatter(
+        selected_categories,
+        None if x_range is None else [float(v) for v in x_range],
+        None if y_range is None else [float(v) for v in y_range]
+    )
+
+def selected_scatter_frame(handle):
+    # The session's filtered frame, recomputed from the handle's categories if it expired
+    frame = sessions.fetch(handle)
+    if frame is None:
+        frame = get_dataset('scatter_groups').take(get_dataset('scatter'), handle['categories'] if handle else None)
+    return frame
+
+def scatter_summary(frame):
+    return html.P(f"選択中: {len(frame):,} 点 / X平均 {frame['x'].mean():.2f} / Y平均 {frame['y'].mean():.2f}")
+
+@callback(
+    Output('scatter-selection', 'data'),
+    Input('scatter-category-filter', 'value'),
+    State('scatter-selection', 'data'),
+    prevent_initial_call=True
+)
+@budget(max_bytes=1_000, max_p50_ms=20)
+def select_scatter_rows(selected_categories, previous_handle):
+    selected_categories = sorted(selected_categories) if selected_categories else None
+    frame = get_dataset('scatter_groups').take(get_dataset('scatter'), selected_categories)
+    return sessions.put('scatter-selection', frame, replaces=previous_handle, categories=selected_categories)
+
+@callback(
+    Output('scatter-summary', 'children'),
+    Input('scatter-selection', 'data'),
+    prevent_initial_call=True
+)
+@budget(max_bytes=1_000, max_p50_ms=20)
+def update_scatter_summary(handle):
+    return scatter_summary(selected_scatter_frame(handle))
+
+@callback(
+    Output('scatter-download', 'data'),
+    Input('scatter-download-button', 'n_clicks'),
+    State('scatter-selection', 'data'),
+    prevent_initial_call=True
+)
+@budget(max_bytes=5_000, max_p50_ms=20)
+def download_scatter_selection(n_clicks, handle):
+    return dcc.send_data_frame(selected_scatter_frame(handle).to_csv, 'scatter_selection.csv', index=False)
+
+@figure_cache.memoize
+def build_3d_scatter(selected_group, progress=None):
+    import plotly.express as px
+    from utils.rendering import voxel_indices
+
+    filtered_df = get_dataset('three_d_groups').take(get_dataset('three_d'), None if selected_group == 'all' else selected_group)
+    title = f"3D散布図 {'' if selected_group == 'all' else f'{selected_group} の'}"
+    
+    # Large clouds are thinned to one point per occupied voxel (kept separately per group)
+    if len(filtered_df) > CLOUD_VOXEL_THRESHOLD:
+        group_codes = filtered_df['group'].cat.codes.to_numpy()
+        rows, _ = voxel_indices(filtered_df[['x', 'y', 'z']].to_numpy(), VOXEL_GRID, keys=group_codes)
+        filtered_df = filtered_df.iloc[rows]
+        title = f"{title}（{VOXEL_GRID}³ボクセルで間引き）"
+    
+    if progress is not None:
+        progress(1, 2)
     fig = px.scatter_3d(
-        filtered_df,
+        labelled_frame(filtered_df, 'group'),
         x='x',
         y='y',
         z='z',
         color='group',
-        title=f"3D散布図 {'' if selected_group == 'all' else f'{selected_group} の'}"
+        title=title
     )
     
     fig.update_layout(
@@ -248,24 +646,34 @@ def update_3d_scatter(selected_group):
         )
     )
     
-    return fig
+    return numeric_figure(fig)
 
-@callback(
-    Output('bar-chart', 'figure'),
-    Input('bar-sort-order', 'value')
+# Filtering and decimating a big cloud runs as a background job
+@background_callback(
+    Output('3d-scatter', 'figure'),
+    Input('3d-group-filter', 'value'),
+    prevent_initial_call=True,
+    **background_job_options('3d-scatter')
 )
-def update_bar_chart(sort_order):
-    df_sorted = bar_df.copy()
-    
-    if sort_order == 'alphabetical':
-        df_sorted = df_sorted.sort_values('category')
-    elif sort_order == 'ascending':
-        df_sorted = df_sorted.sort_values('value')
-    elif sort_order == 'descending':
-        df_sorted = df_sorted.sort_values('value', ascending=False)
-    
+@budget(max_bytes=48_000, max_p50_ms=250)
+def update_3d_scatter(set_progress, selected_group):
+    # No selection (e.g. a value set from a stale session) shows every group
+    return build_3d_scatter(selected_group or 'all', progress=progress_reporter(set_progress))
+
+def sort_bar_df(sort_order):
+    bar_df = get_dataset('bar')
+    if sort_order == 'ascending':
+        return bar_df.sort_values('value')
+    if sort_order == 'descending':
+        return bar_df.sort_values('value', ascending=False)
+    return bar_df.sort_values('category')
+
+@figure_cache.memoize
+def build_bar_chart(sort_order):
+    import plotly.express as px
+
     fig = px.bar(
-        df_sorted,
+        sort_bar_df(sort_order),
         x='category',
         y='value',
         color='value',
@@ -277,4 +685,54 @@ def update_bar_chart(sort_order):
         transition_duration=500
     )
     
-    return fig
\ No newline at end of file
+    return fig
+
+@budget(max_bytes=10_000, max_p50_ms=200)
+def update_bar_chart(sort_order):
+    # The first render needs the whole figure; re-sorting only reorders the existing bars
+    if ctx.triggered_id is None:
+        return build_bar_chart(sort_order)
+    
+    df_sorted = sort_bar_df(sort_order)
+    patched_figure = Patch()
+    patched_figure['data'][0]['x'] = df_sorted['category'].tolist()
+    patched_figure['data'][0]['y'] = df_sorted['value'].tolist()
+    patched_figure['data'][0]['marker']['color'] = df_sorted['value'].tolist()
+    return patched_figure
+
+def default_figures(start_date, end_date):
+    # Figures for the controls' default values, embedded in the layout so the first render
+    # needs no callback round trips. Built concurrently; usually they come from the figure cache.
+    jobs = {
+        'time-series-chart': (build_timeseries, (['value_a', 'value_b'], start_date, end_date, 'lttb', None, 'auto', 'minmax')),
+        'scatter-plot': (build_scatter, (None,)),
+        '3d-scatter': (build_3d_scatter, ('all',)),
+        'bar-chart': (build_bar_chart, ('alphabetical',)),
+    }
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {graph_id: pool.submit(func, *args) for graph_id, (func, args) in jobs.items()}
+    return {graph_id: future.result() for graph_id, future in futures.items()}
+
+# Sorting only reshapes the figure the browser already shows, so it runs clientside when enabled;
+# the Python callback above is the fallback
+if CLIENTSIDE_CALLBACKS:
+    clientside_callback(
+        ClientsideFunction(namespace='viz', function_name='sortBars'),
+        Output('bar-chart', 'figure'),
+        Input('bar-sort-order', 'value'),
+        State('bar-chart', 'figure'),
+        prevent_initial_call=True
+    )
+else:
+    callback(
+        Output('bar-chart', 'figure'),
+        Input('bar-sort-order', 'value'),
+        prevent_initial_call=True
+    )(update_bar_chart)
+
+# Optionally pre-build every figure for the whole input space at startup
+if FIGURE_CACHE_WARM:
+    figure_cache.warm(build_timeseries, [(['value_a', 'value_b'], *time_series_bounds(), 'lttb', None, 'auto', 'minmax')])
+    figure_cache.warm(build_scatter, [(None,), *(([cat],) for cat in get_dataset('scatter_groups').categories)])
+    figure_cache.warm(build_3d_scatter, [('all',), *((group,) for group in get_dataset('three_d_groups').categories)])
+    figure_cache.warm(build_bar_chart, [('alphabetical',), ('ascending',), ('descending',)])
@@ -14,8 +14,15 @@ echo "Installing requirements..."
 pip install -r requirements.txt
 
 # Run the application
-echo "Starting Dash application..."
-python app.py
+# ./run.sh       -> development server (debug mode, hot reload)
+# ./run.sh prod  -> gunicorn with multiple preloaded workers (see gunicorn.conf.py)
+if [ "$1" = "prod" ]; then
+    echo "Starting Dash application (production)..."
+    gunicorn -c gunicorn.conf.py
+else
+    echo "Starting Dash application..."
+    python app.py
+fi
 
 # Deactivate virtual environment on exit
 deactivate
\ No newline at end of file
@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+# Set before anything imports utils.config: each run gets its own cache and data directories,
+# so the app starts from the synthetic sample data and shares nothing with a running server.
+# The app under test runs every Python callback inline with no figure cache, as
+# python -m benchmarks.budgets does, so latency budgets measure the real work.
+_scratch = tempfile.mkdtemp(prefix='dash-tests-')
+os.environ.setdefault('DASH_CACHE_DIR', os.path.join(_scratch, 'cache'))
+os.environ.setdefault('DASH_DATA_DIR', os.path.join(_scratch, 'data'))
+os.environ.setdefault('DASH_CLIENTSIDE_CALLBACKS', '0')
+os.environ.setdefault('DASH_BACKGROUND_CALLBACKS', '0')
+os.environ.setdefault('FIGURE_CACHE_DISK', '0')
+os.environ.setdefault('FIGURE_CACHE_MEMORY_BYTES', '0')
+os.environ.setdefault('DASH_SINGLE_FLIGHT', '0')
@@ -0,0 +1,41 @@
+# Every budgeted page callback must stay within the @budget declared next to it; the same
+# measurement as python -m benchmarks.budgets, so the build fails on a regression
+import pytest
+
+from benchmarks.budgets import check, page_callbacks
+from benchmarks.callbacks import SCENARIOS, build_payload, dependencies, find_dependency, load_app, run_scenario
+from utils.budgets import CALLBACK_BUDGETS
+
+REQUESTS = 5
+
+
+@pytest.fixture(scope='module')
+def app():
+    return load_app()
+
+
+@pytest.fixture(scope='module')
+def deps(app):
+    return dependencies(app)
+
+
+def scenario_callback(app, deps, scenario):
+    dependency = find_dependency(deps, scenario['output'], scenario['changed'])
+    return dependency, app.callback_map[dependency['output']]['callback'].__name__
+
+
+@pytest.mark.parametrize('name', list(SCENARIOS))
+def test_scenario_within_budget(app, deps, name):
+    scenario = SCENARIOS[name]
+    dependency, callback = scenario_callback(app, deps, scenario)
+    assert callback in CALLBACK_BUDGETS, f'{callback} has no @budget'
+    payload = build_payload(dependency, scenario['values'], scenario['changed'], scenario.get('index'))
+    result = run_scenario(app, payload, REQUESTS, 1)
+    assert check(result, CALLBACK_BUDGETS[callback]) == []
+
+
+def test_every_page_callback_has_budget_and_scenario(app, deps):
+    covered = {scenario_callback(app, deps, scenario)[1] for scenario in SCENARIOS.values()}
+    callbacks = page_callbacks(app)
+    assert callbacks - covered == set(), 'callbacks without a scenario in benchmarks/callbacks.py'
+    assert callbacks - set(CALLBACK_BUDGETS) == set(), 'callbacks without @budget'
@@ -0,0 +1,90 @@
+# Page callbacks driven through the Dash endpoint, with the payloads benchmarks.callbacks builds
+import pytest
+
+from benchmarks.callbacks import SCENARIOS, build_payload, dependencies, find_dependency, load_app
+
+ZOOM = {'xaxis.range[0]': '2023-02-01', 'xaxis.range[1]': '2023-02-20'}
+
+
+@pytest.fixture(scope='module')
+def client():
+    app = load_app()
+    client = app.server.test_client()
+    client.deps = dependencies(app)
+    return client
+
+
+def post(client, scenario, changed, **values):
+    scenario = SCENARIOS[scenario]
+    dependency = find_dependency(client.deps, scenario['output'], [changed])
+    payload = build_payload(dependency, {**scenario['values'], **values}, [changed], scenario.get('index'))
+    return client.post('/_dash-update-component', json=payload)
+
+
+def timeseries(client, changed, **values):
+    response = post(client, 'update_timeseries', changed, **values)
+    if response.status_code == 204:
+        return None
+    return response.get_json()['response']['time-series-chart']['figure']
+
+
+def test_zoom_refetches_the_window(client):
+    figure = timeseries(client, 'time-series-chart.relayoutData', **{'time-series-chart.relayoutData': ZOOM})
+    x = figure['data'][0]['x']
+    assert (x[0][:10], x[-1][:10]) == ('2023-02-01', '2023-02-20')
+    assert figure['layout']['uirevision'] == 'zoom'
+
+
+def test_relayout_without_a_range_is_ignored(client):
+    for event in ({'dragmode': 'pan'}, {'autosize': True}):
+        assert timeseries(client, 'time-series-chart.relayoutData', **{'time-series-chart.relayoutData': event}) is None
+
+
+@pytest.mark.parametrize('changed, values', [
+    ('date-picker-range.start_date', {'date-picker-range.start_date': '2023-03-01'}),
+    ('timeseries-resolution.value', {'timeseries-resolution.value': 'week'}),
+])
+def test_other_inputs_ignore_the_previous_zoom(client, changed, values):
+    # relayoutData still holds the earlier zoom, which lies outside the new date range
+    figure = timeseries(client, changed, **{'time-series-chart.relayoutData': ZOOM, **values})
+    x = figure['data'][0]['x']
+    assert x[-1][:10] == '2023-04-10'
+    assert figure['layout']['uirevision'] != 'zoom'
+
+
+def test_large_raw_range_is_handed_to_a_job(client, monkeypatch):
+    from pages import data_visualization
+
+    # Any manager makes the inline callback hand slices over; the job callback itself runs inline here
+    monkeypatch.setattr(data_visualization, 'background_manager', object())
+    monkeypatch.setattr(data_visualization, 'TIMESERIES_BACKGROUND_ROWS', 50)
+    raw = {'timeseries-resolution.value': 'raw', 'timeseries-downsample-method.value': 'minmax'}
+    response = post(client, 'update_timeseries', 'timeseries-resolution.value', **raw).get_json()['response']
+    assert list(response) == ['timeseries-job']
+    job = response['timeseries-job']['data']
+    assert job[5] == 'raw'
+
+    figure = post(client, 'render_timeseries_job', 'timeseries-job.data', **{'timeseries-job.data': job})
+    assert figure.get_json()['response']['time-series-chart']['figure']['layout']['xaxis']['title']['text'] == '日付'
+
+    # A rollup reads a few hundred buckets, so it stays inline
+    response = post(client, 'update_timeseries', 'timeseries-resolution.value', **{'timeseries-resolution.value': 'week'})
+    assert 'time-series-chart' in response.get_json()['response']
+
+
+def test_scatter_relayout_without_a_range_is_ignored(client, monkeypatch):
+    from pages import data_visualization
+
+    # Every selection is drawn as a density grid, so only the range check can skip the re-bin
+    monkeypatch.setattr(data_visualization, 'SCATTER_DENSITY_THRESHOLD', 0)
+    for event in ({'dragmode': 'pan'}, {'autosize': True}, {'legend.x': 0.5}):
+        response = post(client, 'update_scatter', 'scatter-plot.relayoutData', **{'scatter-plot.relayoutData': event})
+        assert response.status_code == 204
+    zoom = {'xaxis.range[0]': 0.0, 'xaxis.range[1]': 1.0, 'yaxis.range[0]': 0.0, 'yaxis.range[1]': 1.0}
+    response = post(client, 'update_scatter', 'scatter-plot.relayoutData', **{'scatter-plot.relayoutData': zoom})
+    assert response.status_code == 200
+
+
+def test_cleared_3d_group_shows_every_group(client):
+    response = post(client, 'update_3d_scatter', '3d-group-filter.value', **{'3d-group-filter.value': None})
+    assert 'None' not in response.get_json()['response']['3d-scatter']['figure']['layout']['title']['text']
@@ -0,0 +1,38 @@
+import numpy as np
+
+from utils.downsample import changes_range, downsample, lttb_indices, minmax_indices, relayout_window
+
+
+def test_lttb_keeps_the_ends_and_the_spike():
+    x = np.arange(10_000)
+    y = np.zeros(10_000)
+    y[4321] = 100
+    idx = lttb_indices(x, y, 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 9_999
+    assert 4321 in idx
+    assert (np.diff(idx) > 0).all()
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=10_000)
+    idx = minmax_indices(y, 50)
+    assert y.argmax() in idx and y.argmin() in idx
+    assert len(idx) <= 2 * 50 + 2
+    assert (np.diff(idx) > 0).all()
+
+
+def test_short_series_is_returned_unchanged():
+    x, y = np.arange(10), np.arange(10.0)
+    assert downsample(x, y, 100)[1] is y
+
+
+def test_relayout_events():
+    zoom = {'xaxis.range[0]': '2023-02-01', 'xaxis.range[1]': '2023-03-01'}
+    assert relayout_window(zoom) == ('2023-02-01', '2023-03-01')
+    assert relayout_window({'xaxis.autorange': True}) is None
+    assert changes_range(zoom) and changes_range({'xaxis.autorange': True})
+    assert not changes_range({'dragmode': 'pan'})
+    assert not changes_range({'autosize': True})
+    assert not changes_range(None)
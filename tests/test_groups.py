@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from utils.groups import GroupIndex
+from utils.rendering import voxel_indices
+
+
+def test_group_rows_match_a_mask():
+    values = pd.Series(['B', 'A', None, 'C', 'A', 'B', 'A'])
+    groups = GroupIndex(values)
+    assert groups.categories == ['A', 'B', 'C']
+    np.testing.assert_array_equal(groups.rows('A'), np.flatnonzero(values == 'A'))
+    np.testing.assert_array_equal(groups.rows(['C', 'A']), np.flatnonzero(values.isin(['A', 'C'])))
+    assert groups.rows(None) is None
+    assert groups.count('missing') == 0
+    assert groups.count(None) == len(values)
+
+
+def test_voxels_cover_every_point_once_per_group():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(size=(5_000, 3))
+    keys = rng.integers(0, 3, size=5_000)
+    rows, counts = voxel_indices(points, 4, keys)
+    assert counts.sum() == len(points)
+    assert len(rows) <= 4 ** 3 * 3
+    # Every group keeps at least one representative
+    assert set(keys[rows]) == {0, 1, 2}
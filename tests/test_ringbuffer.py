@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+
+from utils.live import SimulatedFeed
+from utils.ringbuffer import RingBuffer
+
+
+def buffer(capacity=5):
+    return RingBuffer(capacity, {'seq': 'int64'})
+
+
+def rows(first, n):
+    return {'seq': np.arange(first, first + n)}
+
+
+def test_since_wraps_around_in_order():
+    ring = buffer()
+    for first in range(0, 12, 3):
+        ring.append(rows(first, 3))
+    first, columns = ring.since(0)
+    assert (first, ring.end) == (7, 12)
+    np.testing.assert_array_equal(columns['seq'], np.arange(7, 12))
+    first, columns = ring.since(9, limit=2)
+    np.testing.assert_array_equal(columns['seq'], [10, 11])
+
+
+def test_append_longer_than_capacity_keeps_the_newest():
+    ring = buffer()
+    ring.append(rows(0, 13))
+    first, columns = ring.since(0)
+    assert first == 8
+    np.testing.assert_array_equal(columns['seq'], np.arange(8, 13))
+
+
+def test_overlapping_append_skips_rows_already_held():
+    ring = buffer()
+    ring.append(rows(0, 3), seq=0)
+    ring.append(rows(1, 4), seq=1)
+    assert ring.end == 5
+    np.testing.assert_array_equal(ring.since(0)[1]['seq'], np.arange(5))
+
+
+def test_gap_hides_rows_before_it():
+    ring = buffer()
+    ring.append(rows(0, 3), seq=0)
+    ring.append(rows(10, 2), seq=10)
+    first, columns = ring.since(0)
+    assert first == 10
+    np.testing.assert_array_equal(columns['seq'], [10, 11])
+
+
+def test_concurrent_feed_ticks_keep_sequence_and_time_aligned():
+    feed = SimulatedFeed(100, period_ms=1000)
+    barrier = threading.Barrier(8)
+
+    def tick():
+        barrier.wait()
+        feed.advance()
+
+    threads = [threading.Thread(target=tick) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    first, columns = feed.buffer.since(0)
+    np.testing.assert_array_equal(columns['date'].astype(np.int64) // feed.period_ns, np.arange(first, feed.buffer.end))
+    assert feed.buffer.end <= feed.current_step() + 1
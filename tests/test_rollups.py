@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.rollups import RollupStore, bucket_starts
+from utils.timeseries import TimeSeriesStore
+
+
+def hourly(start, periods, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=periods, freq='h').to_numpy()
+    return index, {'value': rng.normal(size=periods).cumsum()}
+
+
+def assert_tables_equal(actual, expected):
+    for resolution, table in expected.tables.items():
+        other = actual.tables[resolution]
+        for key in ('start', 'first', 'count'):
+            np.testing.assert_array_equal(other[key], table[key], err_msg=f'{resolution} {key}')
+        for stat, values in table['value'].items():
+            np.testing.assert_allclose(other['value'][stat], values, err_msg=f'{resolution} {stat}')
+
+
+def test_buckets_match_pandas_resample():
+    index, columns = hourly('2023-01-01', 24 * 200)
+    rollups = RollupStore(TimeSeriesStore(index, columns))
+    series = pd.Series(columns['value'], index=index)
+    expected = {
+        'week': series.resample('W-MON', label='left', closed='left'),
+        'month': series.resample('MS'),
+        'quarter': series.resample('QS'),
+    }
+    for resolution, resampled in expected.items():
+        dates, stats = rollups.query(resolution)
+        np.testing.assert_array_equal(dates, resampled.mean().index.to_numpy())
+        np.testing.assert_allclose(stats['value']['mean'], resampled.mean().to_numpy())
+        np.testing.assert_allclose(stats['value']['min'], resampled.min().to_numpy())
+        np.testing.assert_allclose(stats['value']['p95'], resampled.quantile(0.95).to_numpy())
+
+
+def test_weeks_start_on_monday():
+    days = np.array(['2024-01-01', '2024-01-07', '2024-01-08'], dtype='datetime64[ns]')
+    np.testing.assert_array_equal(
+        bucket_starts(days, 'week'), np.array(['2024-01-01', '2024-01-01', '2024-01-08'], dtype='datetime64[D]')
+    )
+
+
+@pytest.mark.parametrize('split', [1, 10, 24 * 31 - 5, 24 * 31, 24 * 95])
+def test_append_carries_over_the_last_bucket(split):
+    # Appending rows that continue the last day/week/month/quarter must give the same tables
+    # as building from all rows at once
+    index, columns = hourly('2023-01-01', 24 * 120)
+    rollups = RollupStore(TimeSeriesStore(index[:split], {'value': columns['value'][:split]}))
+    for lo in range(split, len(index), 500):
+        rollups.append(index[lo:lo + 500], {'value': columns['value'][lo:lo + 500]})
+    assert_tables_equal(rollups, RollupStore(TimeSeriesStore(index, columns)))
+    assert len(rollups.store) == len(index)
+
+
+def test_append_rejects_rows_before_the_last_one():
+    index, columns = hourly('2023-01-01', 48)
+    rollups = RollupStore(TimeSeriesStore(index, columns))
+    with pytest.raises(ValueError):
+        rollups.append(index[:1], {'value': columns['value'][:1]})
+
+
+def test_choose_resolution_stays_within_max_points():
+    index, columns = hourly('2020-01-01', 24 * 365 * 2)
+    rollups = RollupStore(TimeSeriesStore(index, columns))
+    assert rollups.choose_resolution('2020-01-01', '2020-01-10', 1000) == 'raw'
+    assert rollups.choose_resolution(None, None, 1000) == 'day'
+    assert rollups.choose_resolution(None, None, 200) == 'week'
+    assert rollups.choose_resolution(None, None, 30) == 'month'
+    assert rollups.count('month') == 24
@@ -0,0 +1,38 @@
+import flask
+import pytest
+
+from utils import sessions
+from utils.sessions import SessionStore
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    monkeypatch.setattr(sessions, 'session_store', SessionStore(path=str(tmp_path / 'sessions.sqlite')))
+    app = flask.Flask(__name__)
+    with app.test_request_context():
+        flask.g.session_id = 'a' * 32
+        yield
+
+
+def test_two_handles_in_one_session_stay_separate(session):
+    # Two tabs share the session cookie; each tab's handle must keep returning its own value
+    first_tab = sessions.put('scatter-selection', 'rows of A', categories=['A'])
+    second_tab = sessions.put('scatter-selection', 'rows of B', categories=['B'])
+    assert sessions.fetch(first_tab) == 'rows of A'
+    assert sessions.fetch(second_tab) == 'rows of B'
+
+
+def test_replaced_handle_falls_back_to_default(session):
+    old = sessions.put('scatter-selection', 'rows of A')
+    new = sessions.put('scatter-selection', 'rows of A and B', replaces=old)
+    assert sessions.fetch(old, 'recompute') == 'recompute'
+    assert sessions.fetch(new) == 'rows of A and B'
+    assert sessions.session_store.info()['entries'] == 1
+
+
+def test_unknown_token_and_other_sessions_get_the_default(session):
+    handle = sessions.put('scatter-selection', 'rows of A')
+    assert sessions.fetch({**handle, 'token': 'ffffffff'}, 'recompute') == 'recompute'
+    flask.g.session_id = 'b' * 32
+    assert sessions.fetch(handle, 'recompute') == 'recompute'
+    assert sessions.fetch(None, 'recompute') == 'recompute'
@@ -0,0 +1,44 @@
+import threading
+import time
+
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_compute_once():
+    flights = SingleFlight('test', cross_process=False)
+    calls = []
+    barrier = threading.Barrier(10)
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'figure'
+
+    def request():
+        barrier.wait()
+        results.append(flights.do('ab' * 20, compute))
+
+    threads = [threading.Thread(target=request) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['figure'] * 10
+    assert len(calls) == 1
+    assert flights.info()['in_flight'] == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flights = SingleFlight('test', cross_process=False)
+
+    def fail():
+        raise RuntimeError('boom')
+
+    for _ in range(2):
+        try:
+            flights.do('cd' * 20, fail)
+        except RuntimeError:
+            pass
+    assert flights.stats['computed'] == 0
+    assert flights.do('cd' * 20, lambda: 'ok') == 'ok'
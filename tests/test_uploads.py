@@ -0,0 +1,72 @@
+import secrets
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.callbacks import load_app
+from utils.datasets import read_npy_dir
+from utils.groups import GroupIndex
+from utils.uploads import parse_upload, read_status
+
+
+def scatter_csv(path, n_rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'x': rng.normal(size=n_rows),
+        'y': rng.normal(size=n_rows),
+        'size': rng.integers(1, 20, n_rows),
+        'category': rng.choice(['D', 'B', 'A', 'C'], n_rows),
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_parsed_columns_round_trip(tmp_path):
+    df = scatter_csv(tmp_path / 'scatter.csv', 250_000)
+    out = tmp_path / 'scatter'
+    out.mkdir()
+    assert parse_upload(str(tmp_path / 'scatter.csv'), 'csv', 'scatter', str(out)) == len(df)
+    loaded = read_npy_dir(str(out))
+    np.testing.assert_allclose(loaded['x'], df['x'])
+    np.testing.assert_array_equal(loaded['size'], df['size'])
+    # Strings come back as a categorical with sorted categories, codes consistent across chunks
+    assert list(loaded['category'].cat.categories) == ['A', 'B', 'C', 'D']
+    np.testing.assert_array_equal(loaded['category'].astype(str).to_numpy(), df['category'].to_numpy())
+    np.testing.assert_array_equal(GroupIndex(loaded['category']).rows('C'), np.flatnonzero(df['category'] == 'C'))
+
+
+def peak_parse_bytes(tmp_path, n_rows):
+    scatter_csv(tmp_path / f'{n_rows}.csv', n_rows)
+    out = tmp_path / f'out-{n_rows}'
+    out.mkdir()
+    tracemalloc.start()
+    try:
+        parse_upload(str(tmp_path / f'{n_rows}.csv'), 'csv', 'scatter', str(out))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_parse_memory_does_not_grow_with_the_file(tmp_path):
+    # Chunks of UPLOAD_PARSE_ROWS rows: four times the rows must not mean more memory
+    small = peak_parse_bytes(tmp_path, 200_000)
+    large = peak_parse_bytes(tmp_path, 800_000)
+    assert large < 1.5 * small
+
+
+def test_file_without_rows_is_rejected(tmp_path):
+    (tmp_path / 'empty.csv').write_text('x,y,size,category\n')
+    out = tmp_path / 'out'
+    out.mkdir()
+    with pytest.raises(ValueError):
+        parse_upload(str(tmp_path / 'empty.csv'), 'csv', 'scatter', str(out))
+
+
+def test_empty_file_gets_an_error_status():
+    client = load_app().server.test_client()
+    upload_id = secrets.token_hex(16)
+    response = client.post(f'/_upload/{upload_id}/chunk?offset=0&total=0&filename=empty.csv&target=scatter', data=b'')
+    assert response.status_code == 400
+    assert read_status(upload_id)['state'] == 'error'
@@ -0,0 +1,59 @@
+import functools
+import os
+
+from dash import callback
+
+from utils.config import BACKGROUND_CACHE_EXPIRE, BACKGROUND_CALLBACKS, CACHE_DIR
+from utils.datasets import dataset_generation
+
+
+def make_background_manager(directory=os.path.join(CACHE_DIR, 'background'), expire=BACKGROUND_CACHE_EXPIRE):
+    # Jobs run in processes forked from the request worker, results go to a diskcache every
+    # worker shares. None when disabled or when the dash[diskcache] extras are missing.
+    if not BACKGROUND_CALLBACKS:
+        return None
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+
+        return DiskcacheManager(diskcache.Cache(directory), cache_by=[dataset_generation], expire=expire)
+    except ImportError:
+        return None
+
+
+background_manager = make_background_manager()
+
+
+def background_callback(*dependencies, progress=None, progress_default=None, running=None, cancel=None,
+                        interval=500, **kwargs):
+    # Register func(set_progress, *values) as a background callback, or as an ordinary
+    # callback with set_progress=None when no manager is available
+    def decorator(func):
+        if background_manager is None:
+            @functools.wraps(func)
+            def synchronous(*values):
+                return func(None, *values)
+
+            callback(*dependencies, **kwargs)(synchronous)
+        else:
+            callback(
+                *dependencies,
+                background=True,
+                manager=background_manager,
+                progress=progress,
+                progress_default=progress_default,
+                running=running,
+                cancel=cancel,
+                interval=interval,
+                **kwargs
+            )(func)
+        return func
+
+    return decorator
+
+
+def progress_reporter(set_progress):
+    # step(done, total) for an html.Progress bound as (value, max); None when running synchronously
+    if set_progress is None:
+        return None
+    return lambda done, total: set_progress((str(done), str(total)))
@@ -0,0 +1,13 @@
+# Performance budgets declared next to each callback, checked offline by tests/test_budgets.py
+# (python -m pytest) and python -m benchmarks.budgets
+# callback function name -> {'max_bytes': serialized response size, 'max_p50_ms': median latency}
+CALLBACK_BUDGETS = {}
+
+
+def budget(max_bytes=None, max_p50_ms=None):
+    # Goes directly above the def (below @callback), so it sees the plain function
+    def decorator(func):
+        CALLBACK_BUDGETS[func.__name__] = {'max_bytes': max_bytes, 'max_p50_ms': max_p50_ms}
+        return func
+
+    return decorator
@@ -0,0 +1,95 @@
+import os
+
+
+def env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return default if value in (None, '') else int(value)
+
+
+def env_float(name, default):
+    value = os.environ.get(name)
+    return default if value in (None, '') else float(value)
+
+
+# Files shared by all workers on the host (figure cache, metrics, ...)
+CACHE_DIR = os.environ.get('DASH_CACHE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache'))
+
+# Development server (python app.py); production runs through gunicorn.conf.py
+DASH_DEBUG = env_flag('DASH_DEBUG', True)
+DASH_PORT = env_int('DASH_PORT', 8051)
+
+# Production server (gunicorn.conf.py)
+WEB_CONCURRENCY = env_int('WEB_CONCURRENCY', (os.cpu_count() or 1) * 2 + 1)
+WEB_THREADS = env_int('WEB_THREADS', 4)
+WEB_BIND = os.environ.get('WEB_BIND', '0.0.0.0:8051')
+WEB_TIMEOUT = env_int('WEB_TIMEOUT', 60)
+PRELOAD_DATASETS = env_flag('PRELOAD_DATASETS', True)
+
+# gzip/brotli response compression (utils/http.py)
+COMPRESS_RESPONSES = env_flag('DASH_COMPRESS', True)
+COMPRESS_MIN_SIZE = env_int('DASH_COMPRESS_MIN_SIZE', 500)
+
+# Per-callback timing histograms served at /metrics (utils/metrics.py)
+METRICS_ENABLED = env_flag('DASH_METRICS', True)
+
+# On-demand callback profiling (utils/profiling.py), off unless enabled. A request is profiled when it
+# carries the header (with PROFILE_TOKEN as value, if set) or is picked at PROFILE_SAMPLE_RATE (0..1).
+# 'sampling' records stacks every PROFILE_INTERVAL_MS into a speedscope file; 'cprofile' saves pstats.
+PROFILING_ENABLED = env_flag('DASH_PROFILING', False)
+PROFILE_HEADER = os.environ.get('PROFILE_HEADER', 'X-Dash-Profile')
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = env_float('PROFILE_SAMPLE_RATE', 0.0)
+PROFILE_MODE = os.environ.get('PROFILE_MODE', 'sampling')
+PROFILE_INTERVAL_MS = env_float('PROFILE_INTERVAL_MS', 2.0)
+PROFILE_KEEP = env_int('PROFILE_KEEP', 100)
+
+# Figure cache (utils/figure_cache.py)
+FIGURE_CACHE_DISK = env_flag('FIGURE_CACHE_DISK', True)
+FIGURE_CACHE_WARM = env_flag('FIGURE_CACHE_WARM', False)
+# Size of the in-process tier; 0 disables it (with FIGURE_CACHE_DISK=0 every call builds its figure)
+FIGURE_CACHE_MEMORY_BYTES = env_int('FIGURE_CACHE_MEMORY_BYTES', 32 * 1024 * 1024)
+# Coalesce identical concurrent figure computations, within and across workers (utils/singleflight.py)
+SINGLE_FLIGHT = env_flag('DASH_SINGLE_FLIGHT', True)
+
+# Send numeric trace arrays as base64 typed arrays (utils/serialization.py).
+# Needs plotly.js >= 2.28 in dcc.Graph; the plotly.js bundled with dash 2.14 is older, so off by default.
+BINARY_FIGURE_ARRAYS = env_flag('DASH_BINARY_FIGURE_ARRAYS', False)
+
+# Rendering policy for large point sets (utils/rendering.py)
+SCATTER_WEBGL_THRESHOLD = env_int('SCATTER_WEBGL_THRESHOLD', 5_000)
+SCATTER_DENSITY_THRESHOLD = env_int('SCATTER_DENSITY_THRESHOLD', 100_000)
+DENSITY_BINS = env_int('DENSITY_BINS', 100)
+CLOUD_VOXEL_THRESHOLD = env_int('CLOUD_VOXEL_THRESHOLD', 50_000)
+VOXEL_GRID = env_int('VOXEL_GRID', 48)
+
+# Chunked uploads (utils/uploads.py): browser slice size, size limit and rows parsed per step
+UPLOAD_CHUNK_BYTES = env_int('UPLOAD_CHUNK_BYTES', 8 * 1024 * 1024)
+UPLOAD_MAX_BYTES = env_int('UPLOAD_MAX_BYTES', 2 * 1024 ** 3)
+UPLOAD_PARSE_ROWS = env_int('UPLOAD_PARSE_ROWS', 100_000)
+
+# Run heavy callbacks as Dash background callbacks in a local process pool (utils/background.py);
+# results are cached on disk for BACKGROUND_CACHE_EXPIRE seconds
+BACKGROUND_CALLBACKS = env_flag('DASH_BACKGROUND_CALLBACKS', True)
+BACKGROUND_CACHE_EXPIRE = env_int('BACKGROUND_CACHE_EXPIRE', 3600)
+# Raw time-series rows above which a slice is handed to a background job instead of answered inline
+TIMESERIES_BACKGROUND_ROWS = env_int('TIMESERIES_BACKGROUND_ROWS', 500_000)
+
+# Live time series (utils/live.py): feed period, points kept in the ring buffer and shown in the chart
+LIVE_PERIOD_MS = env_int('LIVE_PERIOD_MS', 1000)
+LIVE_CAPACITY = env_int('LIVE_CAPACITY', 86_400)
+LIVE_MAX_POINTS = env_int('LIVE_MAX_POINTS', 600)
+
+# Server-side session store (utils/sessions.py): idle lifetime of an entry and total size
+SESSION_COOKIE = os.environ.get('SESSION_COOKIE', 'dash_session')
+SESSION_TTL = env_int('SESSION_TTL', 1800)
+SESSION_MAX_BYTES = env_int('SESSION_MAX_BYTES', 256 * 1024 * 1024)
+
+# Run pure-presentation callbacks in the browser; set to 0 to fall back to the Python versions
+CLIENTSIDE_CALLBACKS = env_flag('DASH_CLIENTSIDE_CALLBACKS', True)
@@ -0,0 +1,203 @@
+import os
+import shutil
+import threading
+import time
+
+# Directory searched for on-disk versions of registered datasets
+DATA_DIR = os.environ.get('DASH_DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data'))
+
+
+def read_parquet(path):
+    import pandas as pd
+
+    return pd.read_parquet(path)
+
+
+def read_arrow_ipc(path):
+    # Memory-mapped, so forked workers share the pages through the OS cache
+    import pyarrow as pa
+
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+CATEGORIES_SUFFIX = '.categories.npy'
+
+
+def read_npy_dir(path):
+    # One <column>.npy file per column, opened read-only with mmap. A string column is stored
+    # as integer codes plus <column>.categories.npy and comes back as a pandas categorical.
+    import numpy as np
+    import pandas as pd
+
+    filenames = sorted(os.listdir(path))
+    columns = {}
+    for filename in filenames:
+        if not filename.endswith('.npy') or filename.endswith(CATEGORIES_SUFFIX):
+            continue
+        column = filename[:-4]
+        values = np.load(os.path.join(path, filename), mmap_mode='r')
+        if column + CATEGORIES_SUFFIX in filenames:
+            categories = np.load(os.path.join(path, column + CATEGORIES_SUFFIX), allow_pickle=False)
+            values = pd.Categorical.from_codes(values, categories)
+        columns[column] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+# File backends, tried in this order for DATA_DIR/<name><suffix>
+FILE_BACKENDS = [
+    ('.parquet', read_parquet),
+    ('.arrow', read_arrow_ipc),
+    ('.feather', read_arrow_ipc),
+    ('', read_npy_dir),
+]
+
+
+class Dataset:
+    def __init__(self, name, loader=None, fallback=None, categories=()):
+        self.name = name
+        self.loader = loader
+        self.fallback = fallback
+        self.categories = categories
+        self.source = None
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _resolve(self, data_dir):
+        if self.loader is not None:
+            return 'custom', self.loader
+        for suffix, reader in FILE_BACKENDS:
+            path = os.path.join(data_dir, self.name + suffix)
+            if (os.path.isdir(path) if suffix == '' else os.path.isfile(path)):
+                return path, lambda path=path, reader=reader: reader(path)
+        if self.fallback is not None:
+            return 'synthetic', self.fallback
+        raise LookupError(f"No data source found for dataset '{self.name}'")
+
+    def get(self, data_dir=DATA_DIR):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                self.source, load = self._resolve(data_dir)
+                value = load()
+                # Low-cardinality string columns are stored once per category, not once per row
+                for column in self.categories:
+                    if value[column].dtype != 'category':
+                        value[column] = value[column].astype('category')
+                self._value = value
+                self._loaded = True
+        return self._value
+
+    def reset(self):
+        with self._lock:
+            self._value = None
+            self._loaded = False
+            self.source = None
+
+
+# name -> Dataset; values are shared by every callback and must be treated as read-only
+dataset_registry = {}
+
+# Touched whenever a dataset file is replaced, so every worker knows to reload
+GENERATION_FILE = os.path.join(DATA_DIR, '.generation')
+GENERATION_CHECK_INTERVAL = 1.0
+_generation = {'mtime': None, 'checked': 0.0}
+_reload_listeners = []
+
+
+def on_datasets_reloaded(func):
+    # Called after datasets were reset because another process replaced one
+    _reload_listeners.append(func)
+    return func
+
+
+def _generation_mtime():
+    try:
+        return os.stat(GENERATION_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+def dataset_generation():
+    # Changes whenever an upload replaces a dataset; part of background-callback cache keys
+    return str(_generation_mtime())
+
+
+def check_generation():
+    # At most one stat() per interval; resets every dataset when the generation changed
+    now = time.monotonic()
+    if now - _generation['checked'] < GENERATION_CHECK_INTERVAL:
+        return False
+    _generation['checked'] = now
+    mtime = _generation_mtime()
+    if mtime == _generation['mtime']:
+        return False
+    first_check = _generation['mtime'] is None and not any(ds._loaded for ds in dataset_registry.values())
+    _generation['mtime'] = mtime
+    if first_check:
+        return False
+    for ds in dataset_registry.values():
+        ds.reset()
+    for func in _reload_listeners:
+        func()
+    return True
+
+
+def npy_staging_dir(name):
+    # Empty directory next to DATA_DIR/<name>/ to build a replacement in; see install_npy_dataset
+    os.makedirs(DATA_DIR, exist_ok=True)
+    staging = os.path.join(DATA_DIR, f'.{name}.tmp-{os.getpid()}-{threading.get_ident()}')
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    return staging
+
+
+def install_npy_dataset(name, staging):
+    # Replace DATA_DIR/<name>/ with the staging directory and bump the generation.
+    # Workers that still map the old files keep them alive until they reload
+    target = os.path.join(DATA_DIR, name)
+    retired = None
+    if os.path.exists(target):
+        retired = os.path.join(DATA_DIR, f'.{name}.old-{os.getpid()}-{time.time_ns()}')
+        os.rename(target, retired)
+    os.rename(staging, target)
+    if retired is not None:
+        shutil.rmtree(retired, ignore_errors=True)
+
+    with open(GENERATION_FILE, 'a'):
+        os.utime(GENERATION_FILE)
+    _generation['checked'] = 0.0
+
+
+def write_npy_dataset(name, columns):
+    # Replace DATA_DIR/<name>/ with one <column>.npy per in-memory column
+    import numpy as np
+
+    staging = npy_staging_dir(name)
+    for column, values in columns.items():
+        np.save(os.path.join(staging, f'{column}.npy'), values, allow_pickle=False)
+    install_npy_dataset(name, staging)
+
+
+def register_dataset(name, loader=None, fallback=None, categories=()):
+    # loader: explicit callable; otherwise DATA_DIR is searched, then fallback is used.
+    # categories: columns converted to the pandas category dtype after loading
+    dataset_registry[name] = Dataset(name, loader=loader, fallback=fallback, categories=categories)
+    return dataset_registry[name]
+
+
+def get_dataset(name):
+    check_generation()
+    return dataset_registry[name].get()
+
+
+def preload_datasets(names=None):
+    # Load eagerly, e.g. in a preloading server master so forked workers share the memory
+    for name in names or list(dataset_registry):
+        get_dataset(name)
+
+
+def loaded_datasets():
+    return {name: ds.source for name, ds in dataset_registry.items() if ds._loaded}
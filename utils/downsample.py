@@ -0,0 +1,90 @@
+import numpy as np
+
+# Roughly the plot area width of a full-width chart on this site
+DEFAULT_MAX_POINTS = 1000
+
+
+def _as_float(x):
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64, copy=False)
+
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: positions of the points to keep.
+    # Each bucket is scored in one vectorized step; only the bucket walk is a Python loop.
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    xf = _as_float(np.asarray(x))
+    yf = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    sums_x = np.add.reduceat(xf[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(yf[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, xf[-1])
+    mean_y = np.append(sums_y / counts, yf[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx = xf[lo:hi]
+        by = yf[lo:hi]
+        # Twice the triangle area against the previous pick and the next bucket's mean
+        area = np.abs((xf[a] - mean_x[i + 1]) * (by - yf[a]) - (xf[a] - bx) * (mean_y[i + 1] - yf[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_buckets):
+    # Keep the minimum and maximum of each equal-width bucket, in original order
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if 2 * n_buckets >= n or n_buckets < 1:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+    valid = ~np.isnan(blocks).all(axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    lows = np.nanargmin(blocks[valid], axis=1) + offsets
+    highs = np.nanargmax(blocks[valid], axis=1) + offsets
+    return np.unique(np.concatenate([[0], lows, highs, [n - 1]]))
+
+
+def downsample(x, y, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    # Returns (x, y) with at most max_points points
+    if len(y) <= max_points:
+        return x, y
+    if method == 'minmax':
+        idx = minmax_indices(y, (max_points - 2) // 2)
+    else:
+        idx = lttb_indices(x, y, max_points)
+    return x[idx], y[idx]
+
+
+def changes_range(relayout_data, axis='xaxis'):
+    # Whether a relayoutData event zoomed, panned or reset the axis, rather than e.g. switching
+    # the drag mode ({'dragmode': 'pan'}) or resizing ({'autosize': True})
+    return any(key.startswith(f'{axis}.range') or key == f'{axis}.autorange' for key in relayout_data or {})
+
+
+def relayout_window(relayout_data, axis='xaxis'):
+    # Visible range of one axis from a dcc.Graph relayoutData event; None means "full range"
+    if not relayout_data or relayout_data.get(f'{axis}.autorange'):
+        return None
+    if f'{axis}.range[0]' in relayout_data and f'{axis}.range[1]' in relayout_data:
+        return relayout_data[f'{axis}.range[0]'], relayout_data[f'{axis}.range[1]']
+    if f'{axis}.range' in relayout_data:
+        start, end = relayout_data[f'{axis}.range']
+        return start, end
+    return None
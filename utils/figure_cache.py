@@ -0,0 +1,225 @@
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from utils.config import CACHE_DIR, SINGLE_FLIGHT
+from utils.singleflight import SingleFlight
+
+
+def data_version(*frames):
+    # Short fingerprint of the data a set of callbacks reads from
+    import pandas as pd
+
+    digest = hashlib.sha1()
+    for df in frames:
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+        digest.update(','.join(map(str, df.columns)).encode())
+    return digest.hexdigest()[:12]
+
+
+class FigureCache:
+    # Two-tier memoization for figure callbacks:
+    # an in-process LRU in front of a SQLite file all workers share.
+    # Both tiers evict by total serialized size. Concurrent misses on the same key are
+    # computed once (utils/singleflight.py), across workers too when the disk tier is on.
+
+    def __init__(self, namespace, version='', max_memory_bytes=32 * 1024 * 1024,
+                 max_disk_bytes=256 * 1024 * 1024, disk_path=None, use_disk=True, single_flight=SINGLE_FLIGHT):
+        self.namespace = namespace
+        self.version = version
+        self._version_source = version
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_path = disk_path or os.path.join(CACHE_DIR, 'figures.sqlite')
+        self.use_disk = use_disk
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        self.flights = SingleFlight(namespace, cross_process=use_disk) if single_flight else None
+
+    # --- keys ---------------------------------------------------------------
+
+    def resolve_version(self):
+        # A callable version is evaluated on first use so the data is not loaded at import
+        if callable(self.version):
+            self.version = self.version()
+        return self.version
+
+    def invalidate_version(self):
+        # Recompute a callable version on next use, e.g. after the underlying data was replaced
+        self.version = self._version_source
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def make_key(self, func_name, args):
+        raw = json.dumps([self.namespace, func_name, self.resolve_version(), args], default=str, sort_keys=True)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    # --- memory tier --------------------------------------------------------
+
+    def _memory_get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            self._memory.move_to_end(key)
+            return entry[0]
+
+    def _memory_set(self, key, figure, size):
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key)[1]
+            self._memory[key] = (figure, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, (_, evicted_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_size
+                self.stats['evictions'] += 1
+
+    # --- disk tier ----------------------------------------------------------
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork (e.g. warm-up in a preloading server master)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.disk_path), exist_ok=True)
+            conn = sqlite3.connect(self.disk_path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS figures '
+                '(key TEXT PRIMARY KEY, value TEXT, size INTEGER, accessed REAL)'
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _disk_get(self, key):
+        if not self.use_disk:
+            return None
+        try:
+            conn = self._connection()
+            row = conn.execute('SELECT value FROM figures WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE figures SET accessed = ? WHERE key = ?', (time.time(), key))
+            return row[0]
+        except sqlite3.Error:
+            return None
+
+    def _disk_set(self, key, payload):
+        if not self.use_disk or len(payload) > self.max_disk_bytes:
+            return
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO figures (key, value, size, accessed) VALUES (?, ?, ?, ?)',
+                (key, payload, len(payload), time.time())
+            )
+            self._disk_evict(conn)
+        except sqlite3.Error:
+            pass
+
+    def _disk_evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM figures').fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM figures ORDER BY accessed'):
+            if total <= self.max_disk_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM figures WHERE key = ?', victims)
+        self.stats['evictions'] += len(victims)
+
+    # --- public API ---------------------------------------------------------
+
+    def get(self, key):
+        figure = self._memory_get(key)
+        if figure is not None:
+            self.stats['memory_hits'] += 1
+            return figure
+
+        figure = self._get_shared(key)
+        if figure is None:
+            self.stats['misses'] += 1
+        return figure
+
+    def _get_shared(self, key):
+        # Disk tier only, i.e. what any worker has stored
+        payload = self._disk_get(key)
+        if payload is None:
+            return None
+        figure = json.loads(payload)
+        self._memory_set(key, figure, len(payload))
+        self.stats['disk_hits'] += 1
+        return figure
+
+    def set(self, key, fig):
+        payload = pio.to_json(fig, validate=False)
+        figure = json.loads(payload)
+        self._memory_set(key, figure, len(payload))
+        self._disk_set(key, payload)
+        return figure
+
+    def memoize(self, func):
+        # Cached results are returned as plain figure dicts, which dcc.Graph accepts as-is.
+        # Keyword arguments (e.g. a progress callback) reach func but are not part of the key.
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = self.make_key(func.__name__, list(args))
+            figure = self.get(key)
+            if figure is not None:
+                return figure
+
+            def compute():
+                return self.set(key, func(*args, **kwargs))
+
+            if self.flights is None:
+                return compute()
+            return self.flights.do(key, compute, lookup=lambda: self._get_shared(key))
+
+        wrapper.uncached = func
+        return wrapper
+
+    def lookup(self, func, *args):
+        # The stored result of a memoized call, or None; never computes it
+        return self.get(self.make_key(func.__name__, list(args)))
+
+    def warm(self, func, arg_tuples):
+        # Fill both tiers for a known input space, e.g. at worker startup
+        for args in arg_tuples:
+            func(*args)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.use_disk:
+            try:
+                self._connection().execute('DELETE FROM figures')
+            except sqlite3.Error:
+                pass
+
+    def info(self):
+        with self._lock:
+            return {
+                **self.stats,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'single_flight': self.flights.info() if self.flights is not None else None,
+            }
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+
+class GroupIndex:
+    # Row positions of every category of one column, built once at load time
+    # so a filter is a gather of k rows instead of an O(n) string comparison.
+
+    def __init__(self, values):
+        categorical = pd.Categorical(values)
+        codes = categorical.codes
+        order = np.argsort(codes, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(categorical.categories)))])
+        # Missing values (code -1) sort first; skip them
+        order = order[int((codes < 0).sum()):]
+        self.categories = list(categorical.categories)
+        self.positions = {
+            category: order[bounds[i]:bounds[i + 1]]
+            for i, category in enumerate(self.categories)
+        }
+        self.n_rows = len(codes)
+
+    @classmethod
+    def from_frame(cls, df, column):
+        return cls(df[column])
+
+    def rows(self, selection):
+        # None for no filter; one category or a list of them otherwise (unknown ones match nothing)
+        if selection is None:
+            return None
+        if isinstance(selection, (list, tuple)):
+            parts = [self.positions.get(value, np.empty(0, dtype=np.intp)) for value in selection]
+            if len(parts) == 1:
+                return parts[0]
+            # Keep the frame's original row order
+            return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+        return self.positions.get(selection, np.empty(0, dtype=np.intp))
+
+    def count(self, selection):
+        rows = self.rows(selection)
+        return self.n_rows if rows is None else len(rows)
+
+    def take(self, df, selection):
+        rows = self.rows(selection)
+        return df if rows is None else df.take(rows)
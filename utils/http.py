@@ -0,0 +1,88 @@
+import re
+
+import flask
+from werkzeug.http import parse_etags
+
+try:
+    import brotli  # noqa: F401  (flask-compress uses it for 'br' when installed)
+except ImportError:
+    brotli = None
+
+# One year; fingerprinted URLs change whenever the file does
+IMMUTABLE_MAX_AGE = 31536000
+
+COMPRESS_MIMETYPES = [
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'text/css',
+    'text/html',
+    'text/plain',
+    'image/svg+xml',
+]
+
+
+# flask-compress rewrites the ETag of a compressed response to "<etag>:<algorithm>", and
+# browsers revalidate with that value
+_COMPRESSED_ETAG_SUFFIX = re.compile(r':(?:br|gzip|deflate)"')
+
+
+def uncompressed_etags(request):
+    # If-None-Match with the compression suffixes removed, to compare against the bare ETag
+    return parse_etags(_COMPRESSED_ETAG_SUFFIX.sub('"', request.headers.get('If-None-Match', '')))
+
+
+def install_compression(app, min_size=500):
+    # gzip (plus brotli when installed) for callback JSON, layouts, bundles and assets
+    try:
+        from flask_compress import Compress
+    except ImportError:
+        app.logger.warning('flask-compress is not installed; responses are sent uncompressed')
+        return False
+
+    server = app.server
+    server.config['COMPRESS_ALGORITHM'] = ['br', 'gzip'] if brotli is not None else ['gzip']
+    server.config['COMPRESS_MIN_SIZE'] = min_size
+    server.config['COMPRESS_MIMETYPES'] = COMPRESS_MIMETYPES
+    Compress(server)
+    return True
+
+
+def _is_fingerprinted(request, app):
+    path = request.path
+    if path.startswith(app.config.requests_pathname_prefix + '_dash-component-suites/'):
+        # Dash rewrites bundle URLs to name.v<version>m<mtime>.js
+        return '.v' in path.rsplit('/', 1)[-1]
+    # Dash appends ?m=<mtime> to every file it links from assets/
+    return path.startswith(app.get_asset_url('')) and 'm' in request.args
+
+
+def install_static_cache_headers(app):
+    # Immutable caching for fingerprinted bundles/assets, ETag revalidation for everything else static
+    server = app.server
+
+    @server.before_request
+    def strip_compressed_etags():
+        # Werkzeug compares If-None-Match with the file's bare ETag before compression adds
+        # the ":gzip"/":br" suffix the browser sends back, so drop the suffix first
+        environ = flask.request.environ
+        if environ.get('HTTP_IF_NONE_MATCH') and flask.request.path.startswith(app.get_asset_url('')):
+            environ['HTTP_IF_NONE_MATCH'] = _COMPRESSED_ETAG_SUFFIX.sub('"', environ['HTTP_IF_NONE_MATCH'])
+
+    @server.after_request
+    def static_cache_headers(response):
+        request = flask.request
+        if request.method != 'GET' or response.status_code not in (200, 304):
+            return response
+
+        if _is_fingerprinted(request, app):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        elif request.path.startswith(app.get_asset_url('')) and response.status_code == 200:
+            response.cache_control.no_cache = True
+            if not response.get_etag()[0] and not response.direct_passthrough:
+                response.add_etag()
+                response.make_conditional(request)
+        return response
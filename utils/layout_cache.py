@@ -0,0 +1,100 @@
+import hashlib
+import threading
+
+import flask
+from dash import page_registry
+from dash._pages import _path_to_page
+from dash._utils import to_json
+
+from utils.http import uncompressed_etags
+
+# Output string of the page_container routing callback Dash registers for use_pages
+PAGES_OUTPUT = '.._pages_content.children..._pages_store.data..'
+
+
+class SerializedLayout:
+    def __init__(self, payload):
+        self.payload = payload.encode() if isinstance(payload, str) else payload
+        self.etag = hashlib.sha1(self.payload).hexdigest()
+
+    def response(self, request):
+        # Strong ETag; a matching If-None-Match gets an empty 304, also when it carries the
+        # ":gzip"/":br" suffix compression added to the ETag it was sent with
+        if self.etag in uncompressed_etags(request):
+            response = flask.Response(status=304)
+        else:
+            response = flask.Response(self.payload, mimetype='application/json')
+        response.set_etag(self.etag)
+        response.cache_control.no_cache = True
+        return response
+
+
+class LayoutCache:
+    # Serialized JSON for the app shell (/_dash-layout) and for every page whose layout is a
+    # static component tree, built once per process and replayed on every navigation.
+    # Pages with layout functions or path variables are left to Dash.
+
+    def __init__(self, app):
+        self.app = app
+        self._app_layout = None
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def app_layout(self):
+        if self._app_layout is None:
+            self._app_layout = SerializedLayout(to_json(self.app._layout_value()))
+        return self._app_layout
+
+    def page(self, pathname):
+        page, path_variables = _path_to_page(self.app.strip_relative_path(pathname))
+        if not page or path_variables or callable(page.get('layout')) or callable(page.get('title')):
+            return None
+        module = page['module']
+        cached = self._pages.get(module)
+        if cached is None:
+            with self._lock:
+                cached = self._pages.get(module)
+                if cached is None:
+                    # Same body Dash's routing callback would send
+                    cached = self._pages[module] = SerializedLayout(to_json({
+                        'multi': True,
+                        'response': {
+                            '_pages_content': {'children': page.get('layout', '')},
+                            '_pages_store': {'data': {'title': page['title']}},
+                        },
+                    }))
+        return cached
+
+    def prime(self):
+        # Serialize everything up front, e.g. in a preloading server master
+        self.app_layout()
+        for page in page_registry.values():
+            self.page(page['relative_path'])
+
+
+def install_layout_cache(app):
+    layout_cache = LayoutCache(app)
+    server = app.server
+    prefix = app.config.requests_pathname_prefix
+
+    @server.before_request
+    def serve_cached_layout():
+        request = flask.request
+        if request.method == 'GET' and request.path == prefix + '_dash-layout':
+            if callable(app.layout):
+                return None
+            return layout_cache.app_layout().response(request)
+
+        if request.method == 'POST' and request.path == prefix + '_dash-update-component':
+            body = request.get_json(silent=True) or {}
+            inputs = body.get('inputs') or []
+            if body.get('output') != PAGES_OUTPUT or len(inputs) != 2:
+                return None
+            values = {item['property']: item.get('value') for item in inputs}
+            if values.get('pathname') is None:
+                return None
+            cached = layout_cache.page(values['pathname'])
+            return None if cached is None else cached.response(request)
+        return None
+
+    return layout_cache
@@ -0,0 +1,42 @@
+import time
+
+import numpy as np
+
+from utils.ringbuffer import RingBuffer
+
+LIVE_COLUMNS = {'date': 'datetime64[ns]', 'value_a': 'float64', 'value_b': 'float64'}
+
+
+def _noise(steps, salt):
+    # Stateless hash noise in [-1, 1): the value at a step depends only on the step
+    return 2 * (np.sin(steps * 12.9898 + salt * 78.233) * 43758.5453 % 1.0) - 1
+
+
+class SimulatedFeed:
+    # Local stand-in for a live source: one point per period. Points are a pure function of
+    # their step number, so every worker produces the same series without sharing state,
+    # and catching up after a pause never generates more than `capacity` points.
+
+    def __init__(self, capacity, period_ms=1000):
+        self.period_ns = period_ms * 1_000_000
+        now = self.current_step()
+        self.buffer = RingBuffer(capacity, LIVE_COLUMNS, start=now - capacity)
+
+    def current_step(self):
+        return time.time_ns() // self.period_ns
+
+    def points(self, steps):
+        phase = 2 * np.pi * steps
+        return {
+            'date': (steps * self.period_ns).astype('datetime64[ns]'),
+            'value_a': 10 * np.sin(phase / 300) + _noise(steps, 1),
+            'value_b': 5 * np.cos(phase / 120) + 2 * _noise(steps, 2),
+        }
+
+    def advance(self):
+        # Generate every step up to now that the buffer does not hold yet
+        end = self.current_step() + 1
+        first = max(self.buffer.end, end - self.buffer.capacity)
+        if first < end:
+            self.buffer.append(self.points(np.arange(first, end, dtype=np.int64)), seq=first)
+        return self.buffer.end
@@ -0,0 +1,232 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+import flask
+
+from utils.config import CACHE_DIR
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# name -> (help text, bucket upper bounds); None instead of buckets makes a counter
+METRICS = {
+    'dash_callback_phase_seconds': ('Wall time per callback request phase', LATENCY_BUCKETS),
+    'dash_callback_response_bytes': ('Serialized callback response size', SIZE_BUCKETS),
+    'dash_singleflight_requests_total': ('Figure computations by single-flight outcome', None),
+}
+
+
+class Histograms:
+    # Cumulative Prometheus-style histograms (and plain counters) kept per process.
+    # Each worker periodically writes its snapshot to a shared directory and
+    # /metrics sums every snapshot, so a scrape sees all workers.
+
+    def __init__(self, directory=os.path.join(CACHE_DIR, 'metrics'), flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._series = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._pid = os.getpid()
+
+    def _get_series(self, key, empty):
+        # A forked child (e.g. a background-callback job) starts from zero, otherwise its
+        # snapshot would count the parent's series a second time
+        if self._pid != os.getpid():
+            self._series = {}
+            self._last_flush = 0.0
+            self._pid = os.getpid()
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = empty
+        return series
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = METRICS[name][1]
+        with self._lock:
+            series = self._get_series(key, {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0})
+            series['buckets'][bisect.bisect_left(buckets, value)] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def increment(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._get_series(key, {'buckets': [], 'sum': 0.0, 'count': 0})
+            series['sum'] += amount
+            series['count'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                {'name': name, 'labels': dict(labels), **{k: (list(v) if k == 'buckets' else v) for k, v in series.items()}}
+                for (name, labels), series in self._series.items()
+            ]
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'{pid}.json')
+
+    def flush(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(os.getpid()) + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self._path(os.getpid()))
+        except OSError:
+            pass
+
+    def prune(self):
+        # Drop snapshots left behind by processes that no longer exist (e.g. a previous run)
+        if not os.path.isdir(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            pid = filename.split('.')[0]
+            if not pid.isdigit():
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    pass
+            except OSError:
+                pass
+
+    def collect(self):
+        # Merge this process's live series with the last snapshot of every other worker
+        merged = {}
+        snapshots = [self.snapshot()]
+        own = f'{os.getpid()}.json'
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                if filename.endswith('.json') and filename != own:
+                    try:
+                        with open(os.path.join(self.directory, filename)) as f:
+                            snapshots.append(json.load(f))
+                    except (OSError, ValueError):
+                        continue
+        for snapshot in snapshots:
+            for series in snapshot:
+                key = (series['name'], tuple(sorted(series['labels'].items())))
+                total = merged.setdefault(key, {'buckets': [0] * len(series['buckets']), 'sum': 0.0, 'count': 0})
+                total['buckets'] = [a + b for a, b in zip(total['buckets'], series['buckets'])]
+                total['sum'] += series['sum']
+                total['count'] += series['count']
+        return merged
+
+    def render(self):
+        # Prometheus text exposition format 0.0.4
+        lines = []
+        merged = self.collect()
+        for name, (help_text, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {"histogram" if buckets else "counter"}')
+            for (series_name, labels), series in sorted(merged.items()):
+                if series_name != name:
+                    continue
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                if buckets is None:
+                    lines.append(f'{name}{{{label_text}}} {series["sum"]:g}')
+                    continue
+                cumulative = 0
+                for bound, count in zip((*buckets, '+Inf'), series['buckets']):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label_text}}} {series["sum"]}')
+                lines.append(f'{name}_count{{{label_text}}} {series["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+histograms = Histograms()
+
+
+def _instrument_callback(entry):
+    # Time the callback entry Dash calls (user function + output validation + serialization)
+    callback = entry['callback']
+    if getattr(callback, 'metrics_instrumented', False):
+        return
+
+    @functools.wraps(callback)
+    def timed_callback(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            flask.g.metrics_callback = time.perf_counter() - started
+
+    timed_callback.metrics_instrumented = True
+    entry['callback'] = timed_callback
+
+
+def install_metrics(app, route='/metrics'):
+    # Instruments every callback of the app and serves the histograms on app.server
+    import dash._callback as dash_callback
+
+    server = app.server
+    histograms.prune()
+
+    # Dash serializes callback responses through dash._callback.to_json
+    original_to_json = dash_callback.to_json
+
+    def timed_to_json(value):
+        started = time.perf_counter()
+        try:
+            return original_to_json(value)
+        finally:
+            if flask.has_request_context():
+                flask.g.metrics_serialize = flask.g.get('metrics_serialize', 0.0) + time.perf_counter() - started
+
+    dash_callback.to_json = timed_to_json
+
+    @server.before_request
+    def start_callback_timer():
+        if not flask.request.path.endswith('_dash-update-component'):
+            return
+        started = time.perf_counter()
+        # Parsed here and cached on the request, so Dash's dispatch does not parse it again
+        body = flask.request.get_json(silent=True) or {}
+        flask.g.metrics_started = started
+        flask.g.metrics_decode = time.perf_counter() - started
+
+        entry = app.callback_map.get(body.get('output'))
+        if entry is not None and 'callback' in entry:
+            _instrument_callback(entry)
+            flask.g.metrics_label = getattr(entry['callback'], '__name__', body.get('output'))
+
+    @server.after_request
+    def record_callback_timings(response):
+        started = flask.g.get('metrics_started')
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        serialize = flask.g.get('metrics_serialize', 0.0)
+        labels = {'callback': flask.g.get('metrics_label', 'unknown')}
+
+        phases = {
+            'decode': flask.g.metrics_decode,
+            'function': max(0.0, flask.g.get('metrics_callback', 0.0) - serialize),
+            'serialize': serialize,
+            'total': total,
+        }
+        for phase, seconds in phases.items():
+            histograms.observe('dash_callback_phase_seconds', {**labels, 'phase': phase}, seconds)
+        histograms.observe('dash_callback_response_bytes', labels, response.content_length or 0)
+        histograms.flush()
+        return response
+
+    @server.route(route)
+    def metrics():
+        return flask.Response(histograms.render(), mimetype='text/plain; version=0.0.4')
+
+    return histograms
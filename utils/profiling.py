@@ -0,0 +1,235 @@
+import cProfile
+import hmac
+import html
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+import flask
+
+from utils.config import (
+    CACHE_DIR, PROFILE_HEADER, PROFILE_INTERVAL_MS, PROFILE_KEEP, PROFILE_MODE, PROFILE_SAMPLE_RATE, PROFILE_TOKEN
+)
+
+PROFILE_DIR = os.path.join(CACHE_DIR, 'profiles')
+
+PROFILE_SUFFIXES = {'sampling': '.speedscope.json', 'cprofile': '.pstats'}
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9_-]+')
+_PROFILE_NAME = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+class StackSampler:
+    # Statistical profiler: a helper thread records the profiled thread's Python stack every
+    # interval, so the request itself runs undisturbed between samples
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL_MS / 1000):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames = {}  # (function, file, first line) -> index, in insertion order
+        self.samples = []
+        self.weights = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(self.frames.setdefault((code.co_name, code.co_filename, code.co_firstlineno), len(self.frames)))
+                frame = frame.f_back
+            if stack:
+                self.samples.append(stack[::-1])
+                self.weights.append((now - last) * 1e3)
+            last = now
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def speedscope(self, name):
+        # https://www.speedscope.app/file-format-schema.json, "sampled" profile
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'utils/profiling.py',
+            'shared': {'frames': [{'name': n, 'file': f, 'line': line} for n, f, line in self.frames]},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': sum(self.weights),
+                'samples': self.samples,
+                'weights': self.weights,
+            }],
+        }
+
+
+class RequestProfile:
+    # One profiled _dash-update-component request, in either mode
+    def __init__(self, mode):
+        self.mode = mode
+        self.profiler = cProfile.Profile() if mode == 'cprofile' else StackSampler(threading.get_ident())
+
+    def start(self):
+        self.started = time.perf_counter()
+        if self.mode == 'cprofile':
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+
+    def stop(self):
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+        self.duration = time.perf_counter() - self.started
+
+    def write(self, path, name):
+        if self.mode == 'cprofile':
+            self.profiler.dump_stats(path)
+            return None
+        with open(path, 'w') as f:
+            json.dump(self.profiler.speedscope(name), f)
+        return len(self.profiler.samples)
+
+
+# --- saved profiles ------------------------------------------------------------------
+
+def save_profile(profile, output, callback, directory=PROFILE_DIR, keep=PROFILE_KEEP):
+    # <time>-<pid>-<callback>.<suffix>, plus a .meta.json sidecar the index page reads
+    os.makedirs(directory, exist_ok=True)
+    stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 1_000_000:06d}-{os.getpid()}-{_UNSAFE.sub('_', callback)[:60]}"
+    filename = stem + PROFILE_SUFFIXES[profile.mode]
+    samples = profile.write(os.path.join(directory, filename), f'{callback} {output}')
+    meta = {
+        'file': filename,
+        'output': output,
+        'callback': callback,
+        'mode': profile.mode,
+        'duration_ms': round(profile.duration * 1e3, 2),
+        'samples': samples,
+        'created': time.time(),
+    }
+    with open(os.path.join(directory, stem + '.meta.json'), 'w') as f:
+        json.dump(meta, f)
+    prune_profiles(directory, keep)
+    return filename
+
+
+def recent_profiles(directory=PROFILE_DIR, limit=None):
+    profiles = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return profiles
+    for name in names:
+        if name.endswith('.meta.json'):
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    profiles.sort(key=lambda meta: meta['created'], reverse=True)
+    return profiles[:limit]
+
+
+def prune_profiles(directory=PROFILE_DIR, keep=PROFILE_KEEP):
+    for meta in recent_profiles(directory)[keep:]:
+        for name in (meta['file'], meta['file'].split('.')[0] + '.meta.json'):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+# --- Flask hooks -----------------------------------------------------------------------
+
+def _wants_profile(request):
+    value = request.headers.get(PROFILE_HEADER)
+    if value is not None:
+        return not PROFILE_TOKEN or hmac.compare_digest(value, PROFILE_TOKEN)
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _index_page(profiles, prefix):
+    rows = ''.join(
+        '<tr><td>{created}</td><td>{callback}</td><td><code>{output}</code></td><td>{duration}</td>'
+        '<td>{mode}</td><td>{samples}</td><td><a href="{prefix}/{file}">{file}</a></td></tr>'.format(
+            created=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(meta['created'])),
+            callback=html.escape(meta['callback']),
+            output=html.escape(meta['output']),
+            duration=f"{meta['duration_ms']:.1f}",
+            mode=meta['mode'],
+            samples='' if meta['samples'] is None else meta['samples'],
+            prefix=prefix,
+            file=html.escape(meta['file']),
+        )
+        for meta in profiles
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>プロファイル</title></head><body>'
+        '<h1>最近のプロファイル</h1>'
+        '<p>.speedscope.json は https://www.speedscope.app で、.pstats は python -m pstats や snakeviz で開けます。</p>'
+        '<table border="1" cellpadding="4"><tr><th>日時</th><th>コールバック</th><th>出力ID</th>'
+        '<th>時間 (ms)</th><th>方式</th><th>サンプル数</th><th>ファイル</th></tr>'
+        f'{rows}</table></body></html>'
+    )
+
+
+def install_profiling(app, route='_profiles', mode=PROFILE_MODE):
+    # Profiles single _dash-update-component requests that ask for it (header) or are sampled,
+    # and lists the saved profiles at /_profiles. The profiled request's response names the
+    # file in the X-Dash-Profile-File header.
+    if mode not in PROFILE_SUFFIXES:
+        raise ValueError(f"PROFILE_MODE must be one of {', '.join(PROFILE_SUFFIXES)}")
+    server = app.server
+    prefix = app.config.routes_pathname_prefix + route
+
+    @server.before_request
+    def start_profile():
+        request = flask.request
+        if not request.path.endswith('_dash-update-component') or not _wants_profile(request):
+            return
+        profile = RequestProfile(mode)
+        try:
+            profile.start()
+        except ValueError:
+            # cProfile: another profiler is already active in this interpreter
+            return
+        flask.g.profile = profile
+
+    @server.after_request
+    def save_request_profile(response):
+        profile = flask.g.pop('profile', None)
+        if profile is None:
+            return response
+        profile.stop()
+        output = (flask.request.get_json(silent=True) or {}).get('output', 'unknown')
+        entry = app.callback_map.get(output, {})
+        callback = getattr(entry.get('callback'), '__name__', output)
+        response.headers['X-Dash-Profile-File'] = save_profile(profile, output, callback)
+        return response
+
+    @server.route(prefix)
+    def profile_index():
+        response = flask.Response(_index_page(recent_profiles(), prefix), mimetype='text/html')
+        response.cache_control.no_store = True
+        return response
+
+    @server.route(prefix + '/<name>')
+    def profile_file(name):
+        if not _PROFILE_NAME.match(name) or name.endswith('.meta.json'):
+            flask.abort(404)
+        return flask.send_from_directory(PROFILE_DIR, name, as_attachment=True)
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+def scatter_render_mode(n_points, webgl_threshold):
+    # SVG is sharper and supports transitions; WebGL stays interactive with many points
+    return 'webgl' if n_points > webgl_threshold else 'svg'
+
+
+def density_grid(x, y, bins, x_range=None, y_range=None):
+    # Point counts on a bins x bins grid (numpy.histogram2d); empty cells become NaN so they render transparent
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x_range is None:
+        x_range = (x.min(), x.max()) if len(x) else (0.0, 1.0)
+    if y_range is None:
+        y_range = (y.min(), y.max()) if len(y) else (0.0, 1.0)
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=[x_range, y_range])
+    z = np.where(counts > 0, counts, np.nan).T
+    return z, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
+
+
+def voxel_indices(points, grid, keys=None):
+    # One representative row per occupied voxel of a grid^3 lattice over the bounding box.
+    # keys (e.g. group codes) keep separate voxels per key so every group stays visible.
+    # Returns (row positions, number of points each representative stands for).
+    points = np.asarray(points, dtype=np.float64)
+    low = points.min(axis=0)
+    span = np.where(points.max(axis=0) > low, points.max(axis=0) - low, 1.0)
+    cells = np.minimum(((points - low) / span * grid).astype(np.int64), grid - 1)
+    voxel_id = (cells[:, 0] * grid + cells[:, 1]) * grid + cells[:, 2]
+    if keys is not None:
+        voxel_id = voxel_id + np.asarray(keys, dtype=np.int64) * grid ** 3
+    _, first, counts = np.unique(voxel_id, return_index=True, return_counts=True)
+    order = np.argsort(first)
+    return first[order], counts[order]
@@ -0,0 +1,49 @@
+import threading
+
+import numpy as np
+
+
+class RingBuffer:
+    # Fixed-capacity column store: once full, each append overwrites the oldest rows, so memory
+    # stays constant however long it runs. Rows are addressed by an ever-increasing sequence number.
+
+    def __init__(self, capacity, dtypes, start=0):
+        self.capacity = capacity
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+        self.end = start
+        self._first = start
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def start(self):
+        # Sequence number of the oldest row still held
+        return max(self._first, self.end - self.capacity)
+
+    def append(self, rows, seq=None):
+        # rows continue at `seq` (default: right after the newest row); rows in a gap are dropped,
+        # and so are rows already held, e.g. when another thread appended the same steps first
+        n = len(next(iter(rows.values())))
+        with self._lock:
+            if seq is None:
+                seq = self.end
+            elif seq > self.end:
+                # Nothing before the gap continues the new rows
+                self.end = self._first = seq
+            # Row i is number seq + i; skip the ones already held and the ones overwritten anyway
+            skip = max(self.end - seq, n - self.capacity)
+            slots = np.arange(seq + skip, seq + n) % self.capacity
+            for name, values in rows.items():
+                self.columns[name][slots] = np.asarray(values)[skip:]
+            self.end = max(self.end, seq + n)
+
+    def since(self, seq, limit=None):
+        # Rows numbered seq.. in order (at most the newest `limit`), and the sequence number of the first
+        with self._lock:
+            first = max(seq, self.start)
+            if limit is not None:
+                first = max(first, self.end - limit)
+            slots = np.arange(first, self.end) % self.capacity
+            return first, {name: column[slots] for name, column in self.columns.items()}
@@ -0,0 +1,136 @@
+import numpy as np
+
+from utils.timeseries import to_datetime64
+
+# Finest to coarsest; weeks start on Monday, quarters in January/April/July/October
+RESOLUTIONS = ('day', 'week', 'month', 'quarter')
+ROLLUP_STATS = ('mean', 'min', 'max', 'p5', 'p95')
+
+
+def bucket_starts(index, resolution):
+    # Start day of the bucket each datetime64 value falls into
+    days = index.astype('datetime64[D]')
+    if resolution == 'day':
+        return days
+    if resolution == 'week':
+        # 1970-01-01 was a Thursday
+        day_numbers = days.astype(np.int64)
+        return (day_numbers - (day_numbers + 3) % 7).astype('datetime64[D]')
+    months = index.astype('datetime64[M]').astype(np.int64)
+    if resolution == 'quarter':
+        months = months - months % 3
+    elif resolution != 'month':
+        raise ValueError(f'unknown resolution {resolution!r}')
+    return months.astype('datetime64[M]').astype('datetime64[D]')
+
+
+def group_quantiles(values, starts, counts, quantiles):
+    # Linear-interpolated quantiles of consecutive groups, all groups in one sort
+    groups = np.repeat(np.arange(len(starts)), counts)
+    ordered = values[np.lexsort((values, groups))]
+    results = []
+    for q in quantiles:
+        position = starts + q * (counts - 1)
+        lo = np.floor(position).astype(np.int64)
+        hi = np.minimum(lo + 1, starts + counts - 1)
+        results.append(ordered[lo] + (ordered[hi] - ordered[lo]) * (position - lo))
+    return results
+
+
+def aggregate(index, columns, resolution, offset=0):
+    # One row per bucket of a sorted index: start, first row position, count and the stats per column
+    keys = bucket_starts(index, resolution)
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]])) if len(keys) else np.zeros(0, np.int64)
+    counts = np.diff(np.append(starts, len(keys)))
+    table = {'start': keys[starts].astype('datetime64[ns]'), 'first': starts + offset, 'count': counts}
+    for name, values in columns.items():
+        values = np.asarray(values, dtype=np.float64)
+        if not len(starts):
+            table[name] = {stat: np.zeros(0) for stat in ROLLUP_STATS}
+            continue
+        p5, p95 = group_quantiles(values, starts, counts, (0.05, 0.95))
+        table[name] = {
+            'mean': np.add.reduceat(values, starts) / counts,
+            'min': np.minimum.reduceat(values, starts),
+            'max': np.maximum.reduceat(values, starts),
+            'p5': p5,
+            'p95': p95,
+        }
+    return table
+
+
+def _concat(head, tail):
+    return {
+        key: {stat: np.concatenate([head[key][stat], tail[key][stat]]) for stat in ROLLUP_STATS}
+        if isinstance(value, dict) else np.concatenate([value, tail[key]])
+        for key, value in head.items()
+    }
+
+
+def _head(table, n):
+    return {
+        key: {stat: values[:n] for stat, values in value.items()} if isinstance(value, dict) else value[:n]
+        for key, value in table.items()
+    }
+
+
+class RollupStore:
+    # Pre-aggregated copies of a TimeSeriesStore, one table per resolution with the mean, min,
+    # max and 5th/95th percentile of every numeric column per bucket. A multi-year range reads
+    # a few hundred bucket rows instead of the raw rows; append() adds raw rows and recomputes
+    # only the buckets they fall into.
+
+    def __init__(self, store, columns=None, resolutions=RESOLUTIONS):
+        self.store = store
+        raw = store.columns
+        self.column_names = list(columns or [name for name, values in raw.items() if np.issubdtype(values.dtype, np.number)])
+        self.tables = {
+            resolution: aggregate(store.index, {name: raw[name] for name in self.column_names}, resolution)
+            for resolution in resolutions
+        }
+
+    def append(self, index, columns):
+        first_new = self.store.append(index, columns)
+        if first_new == len(self.store):
+            return
+        raw_index = self.store.index
+        raw = self.store.columns
+        for resolution, table in self.tables.items():
+            # The last bucket may gain rows, so it is rebuilt together with the new ones
+            keep = len(table['start'])
+            if keep and bucket_starts(raw_index[first_new:first_new + 1], resolution)[0] == table['start'][-1]:
+                keep -= 1
+            lo = int(table['first'][keep]) if keep < len(table['start']) else first_new
+            tail = aggregate(raw_index[lo:], {name: raw[name][lo:] for name in self.column_names}, resolution, offset=lo)
+            # Swapped in whole, so a concurrent query sees either the old or the new table
+            self.tables[resolution] = _concat(_head(table, keep), tail)
+
+    def _bounds(self, table, start, end):
+        # Buckets overlapping start <= t <= end; the edge buckets are included whole
+        starts = table['start']
+        lo = 0 if start is None else max(int(np.searchsorted(starts, to_datetime64(start), side='right')) - 1, 0)
+        hi = len(starts) if end is None else int(np.searchsorted(starts, to_datetime64(end), side='right'))
+        return lo, max(lo, hi)
+
+    def count(self, resolution, start=None, end=None):
+        lo, hi = self._bounds(self.tables[resolution], start, end)
+        return hi - lo
+
+    def query(self, resolution, start=None, end=None, columns=None):
+        # (bucket start dates, {column: {stat: values}}) as views into the table
+        table = self.tables[resolution]
+        lo, hi = self._bounds(table, start, end)
+        return table['start'][lo:hi], {
+            name: {stat: values[lo:hi] for stat, values in table[name].items()}
+            for name in (columns or self.column_names)
+        }
+
+    def choose_resolution(self, start, end, max_points):
+        # The raw rows if they fit, otherwise the finest resolution with at most max_points buckets
+        lo, hi = self.store.bounds(start, end)
+        if hi - lo <= max_points:
+            return 'raw'
+        for resolution in self.tables:
+            if self.count(resolution, start, end) <= max_points:
+                return resolution
+        return resolution
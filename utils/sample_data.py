@@ -0,0 +1,62 @@
+import functools
+
+
+@functools.lru_cache(maxsize=1)
+def generate_sample_data():
+    # Synthetic data for the visualization page.
+    # Everything comes from one seeded stream, so the frames are identical run to run.
+    import numpy as np
+    import pandas as pd
+
+    np.random.seed(42)
+
+    # Time series data
+    dates = pd.date_range(start='2023-01-01', periods=100, freq='D')
+    time_series_df = pd.DataFrame({
+        'date': dates,
+        'value_a': np.cumsum(np.random.normal(0, 1, 100)),
+        'value_b': np.cumsum(np.random.normal(0, 2, 100))
+    })
+
+    # Scatter data
+    scatter_df = pd.DataFrame({
+        'x': np.random.normal(0, 1, 200),
+        'y': np.random.normal(0, 1, 200),
+        'size': np.random.uniform(5, 25, 200),
+        'category': np.random.choice(['A', 'B', 'C', 'D'], 200)
+    })
+
+    # Bar chart data
+    categories = ['Category A', 'Category B', 'Category C', 'Category D', 'Category E']
+    bar_df = pd.DataFrame({
+        'category': categories,
+        'value': np.random.randint(10, 100, len(categories))
+    })
+
+    # 3D data
+    n_points = 500
+    theta = np.random.uniform(0, 2*np.pi, n_points)
+    phi = np.random.uniform(0, np.pi, n_points)
+    r = np.random.normal(5, 1, n_points)
+
+    x = r * np.sin(phi) * np.cos(theta)
+    y = r * np.sin(phi) * np.sin(theta)
+    z = r * np.cos(phi)
+
+    three_d_df = pd.DataFrame({
+        'x': x,
+        'y': y,
+        'z': z,
+        'group': np.random.choice(['Group 1', 'Group 2', 'Group 3'], n_points)
+    })
+
+    return {
+        'time_series': time_series_df,
+        'scatter': scatter_df,
+        'bar': bar_df,
+        'three_d': three_d_df
+    }
+
+
+def sample_loader(name):
+    return lambda: generate_sample_data()[name]
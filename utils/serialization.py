@@ -0,0 +1,72 @@
+import base64
+
+try:
+    import orjson
+except ImportError:  # optional; plotly falls back to the standard json module
+    orjson = None
+
+# NumPy dtype name -> plotly.js typed-array dtype name (by name, so importing this module
+# from app.py does not import numpy)
+TYPED_ARRAY_DTYPES = {
+    'float64': 'f8',
+    'float32': 'f4',
+    'int32': 'i4',
+    'uint32': 'u4',
+    'int16': 'i2',
+    'uint16': 'u2',
+    'int8': 'i1',
+    'uint8': 'u1',
+}
+
+# Shorter arrays are cheaper as plain JSON than as base64 plus the wrapper object
+MIN_TYPED_ARRAY_LENGTH = 64
+
+
+def configure_json_engine():
+    # Dash serializes callback responses with plotly.io.json, which can use orjson
+    import plotly.io as pio
+
+    pio.json.config.default_engine = 'orjson' if orjson is not None else 'json'
+    return pio.json.config.default_engine
+
+
+def typed_array(values, float32=False):
+    # {'dtype', 'bdata'} form understood by plotly.js >= 2.28, or None if not numeric.
+    # float32 halves the size of float data; ~7 significant digits is plenty for plotting.
+    import numpy as np
+
+    array = np.asarray(values)
+    if float32 and array.dtype == np.float64:
+        array = array.astype(np.float32)
+    if array.dtype.kind == 'i' and array.dtype.itemsize == 8:
+        info = np.iinfo(np.int32)
+        array = array.astype(np.int32) if (array.min() >= info.min and array.max() <= info.max) else array.astype(np.float64)
+    elif array.dtype.kind == 'u' and array.dtype.itemsize == 8:
+        array = array.astype(np.uint32) if array.max() <= np.iinfo(np.uint32).max else array.astype(np.float64)
+    dtype = TYPED_ARRAY_DTYPES.get(array.dtype.name)
+    if dtype is None or array.ndim != 1:
+        return None
+    data = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+    return {'dtype': dtype, 'bdata': base64.b64encode(data.tobytes()).decode('ascii')}
+
+
+def _encode_value(value, min_length, float32):
+    import numpy as np
+
+    if isinstance(value, dict):
+        return {k: _encode_value(v, min_length, float32) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)) and len(value) >= min_length:
+        if isinstance(value, np.ndarray) or all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+            encoded = typed_array(value, float32)
+            if encoded is not None:
+                return encoded
+    return value
+
+
+def encode_typed_arrays(fig, min_length=MIN_TYPED_ARRAY_LENGTH, float32=False):
+    # Figure dict whose numeric trace arrays (x, y, z, marker.size, ...) are base64 typed arrays
+    figure = fig if isinstance(fig, dict) else fig.to_plotly_json()
+    return {
+        **figure,
+        'data': [_encode_value(trace, min_length, float32) for trace in figure.get('data', [])]
+    }
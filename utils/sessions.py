@@ -0,0 +1,152 @@
+import os
+import pickle
+import re
+import secrets
+import sqlite3
+import threading
+import time
+
+import flask
+
+from utils.config import CACHE_DIR, SESSION_COOKIE, SESSION_MAX_BYTES, SESSION_TTL
+
+_SESSION_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class SessionStore:
+    # Per-session values kept on the server, in a SQLite file every worker shares.
+    # Entries expire SESSION_TTL seconds after their last use; beyond max_bytes the least
+    # recently used entries (of any session) are evicted. Values are pickled, so only
+    # server-produced data belongs here.
+
+    def __init__(self, path=None, ttl=SESSION_TTL, max_bytes=SESSION_MAX_BYTES):
+        self.path = path or os.path.join(CACHE_DIR, 'sessions.sqlite')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS session_values '
+                '(session TEXT, key TEXT, value BLOB, size INTEGER, accessed REAL, '
+                'PRIMARY KEY (session, key))'
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, session_id, key, default=None):
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            'SELECT value FROM session_values WHERE session = ? AND key = ? AND accessed > ?',
+            (session_id, key, now - self.ttl)
+        ).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return default
+        conn.execute('UPDATE session_values SET accessed = ? WHERE session = ? AND key = ?', (now, session_id, key))
+        self.stats['hits'] += 1
+        return pickle.loads(row[0])
+
+    def set(self, session_id, key, value):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return False
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO session_values (session, key, value, size, accessed) VALUES (?, ?, ?, ?, ?)',
+            (session_id, key, payload, len(payload), time.time())
+        )
+        self._evict(conn)
+        return True
+
+    def delete(self, session_id, key=None):
+        conn = self._connection()
+        if key is None:
+            conn.execute('DELETE FROM session_values WHERE session = ?', (session_id,))
+        else:
+            conn.execute('DELETE FROM session_values WHERE session = ? AND key = ?', (session_id, key))
+
+    def _evict(self, conn):
+        conn.execute('DELETE FROM session_values WHERE accessed <= ?', (time.time() - self.ttl,))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM session_values').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for session_id, key, size in conn.execute('SELECT session, key, size FROM session_values ORDER BY accessed'):
+            if total <= self.max_bytes:
+                break
+            victims.append((session_id, key))
+            total -= size
+        conn.executemany('DELETE FROM session_values WHERE session = ? AND key = ?', victims)
+        self.stats['evictions'] += len(victims)
+
+    def info(self):
+        conn = self._connection()
+        sessions, entries, size = conn.execute(
+            'SELECT COUNT(DISTINCT session), COUNT(*), COALESCE(SUM(size), 0) FROM session_values'
+        ).fetchone()
+        return {'sessions': sessions, 'entries': entries, 'bytes': size, **self.stats}
+
+
+session_store = SessionStore()
+
+
+def current_session_id():
+    # Set for every request by install_sessions
+    return flask.g.session_id
+
+
+def _entry_key(handle):
+    return f"{handle['key']}:{handle['token']}"
+
+
+def put(key, value, replaces=None, **handle):
+    # Store value for the current session; returns the small handle a dcc.Store should carry.
+    # Each write gets a new token, which also names the entry: two tabs share the session
+    # cookie, so a fixed key would let one tab read the other's value. replaces: the handle
+    # this one supersedes (the Store's previous value), whose entry is dropped.
+    handle = {'key': key, 'token': secrets.token_hex(4), **handle}
+    session_id = current_session_id()
+    session_store.set(session_id, _entry_key(handle), value)
+    if replaces and replaces.get('key') == key and 'token' in replaces:
+        session_store.delete(session_id, _entry_key(replaces))
+    return handle
+
+
+def fetch(handle, default=None):
+    # default when the entry expired or was evicted; the caller recomputes from the handle
+    if not handle:
+        return default
+    return session_store.get(current_session_id(), _entry_key(handle), default)
+
+
+def install_sessions(app, cookie=SESSION_COOKIE):
+    # Every browser gets a random session id in an HttpOnly cookie. The index page is the
+    # first request, so callbacks already carry the cookie; static files never set it,
+    # which keeps their responses cacheable by shared caches.
+    server = app.server
+    static_prefixes = (app.config.requests_pathname_prefix + '_dash-component-suites/', app.get_asset_url(''))
+
+    @server.before_request
+    def load_session_id():
+        session_id = flask.request.cookies.get(cookie, '')
+        flask.g.new_session = not _SESSION_ID.match(session_id)
+        flask.g.session_id = secrets.token_hex(16) if flask.g.new_session else session_id
+
+    @server.after_request
+    def save_session_id(response):
+        if flask.g.get('new_session') and not flask.request.path.startswith(static_prefixes):
+            response.set_cookie(cookie, flask.g.session_id, httponly=True, samesite='Lax', secure=flask.request.is_secure)
+        return response
+
+    return session_store
@@ -0,0 +1,103 @@
+import os
+import threading
+
+from utils.config import CACHE_DIR
+from utils.metrics import histograms
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays within the worker
+    fcntl = None
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # Runs at most one computation per key at a time; identical concurrent calls wait for it.
+    # Within a worker the waiters share the leader's result directly. Across workers the
+    # leaders take a byte-range lock on one shared file (offset = key hash), and a worker that
+    # had to wait for the lock first asks lookup() whether the result is already in a shared
+    # store (e.g. the figure cache's SQLite tier) before computing it again.
+
+    def __init__(self, name, lock_path=None, cross_process=True):
+        self.name = name
+        self.lock_path = lock_path or os.path.join(CACHE_DIR, 'singleflight.lock')
+        self.cross_process = cross_process and fcntl is not None
+        self._pid = None
+        self._reset()
+        self.stats = {'computed': 0, 'coalesced': 0, 'shared': 0}
+
+    def _count(self, outcome):
+        self.stats[outcome] += 1
+        histograms.increment('dash_singleflight_requests_total', {'cache': self.name, 'outcome': outcome})
+        histograms.flush()
+
+    def _reset(self):
+        # A forked child (e.g. a background-callback job) inherits the flights of threads that
+        # do not exist in it, and possibly a held lock, so it starts with fresh ones
+        if self._pid != os.getpid():
+            self._flights = {}
+            self._lock = threading.Lock()
+            self._fd = None
+            self._pid = os.getpid()
+
+    def _lock_fd(self):
+        # One descriptor per process: closing any descriptor of the file would drop every
+        # lock this process holds on it, including other threads'
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+            self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _run_locked(self, key, compute, lookup):
+        if not self.cross_process:
+            return compute(), 'computed'
+        fd = self._lock_fd()
+        offset = int(key[:12], 16) if len(key) >= 12 else hash(key) & 0xFFFFFFFFFFFF
+        fcntl.lockf(fd, fcntl.LOCK_EX, 1, offset)
+        try:
+            # Another worker may have finished the same computation while we waited
+            result = lookup() if lookup is not None else None
+            if result is not None:
+                return result, 'shared'
+            return compute(), 'computed'
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN, 1, offset)
+
+    def do(self, key, compute, lookup=None):
+        # key: hex digest identifying the inputs; compute(): the work; lookup(): shared result or None
+        self._reset()
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self._count('coalesced')
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result, outcome = self._run_locked(key, compute, lookup)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        self._count(outcome)
+        return flight.result
+
+    def info(self):
+        self._reset()
+        with self._lock:
+            return {**self.stats, 'in_flight': len(self._flights)}
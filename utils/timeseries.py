@@ -0,0 +1,93 @@
+import numpy as np
+
+
+def to_datetime64(value):
+    # Date picker values arrive as 'YYYY-MM-DD' or ISO datetime strings
+    return np.datetime64(value, 'ns')
+
+
+def _grow(values, capacity):
+    grown = np.empty(capacity, dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+class TimeSeriesStore:
+    # Column store for a time series, kept sorted by its datetime64 index
+    # so range queries are two binary searches and return views, not copies.
+    # Rows can be appended in time order; storage grows geometrically, so views
+    # handed out earlier stay valid and appends cost amortized O(new rows).
+
+    def __init__(self, index, columns):
+        index = np.asarray(index, dtype='datetime64[ns]')
+        order = None
+        if len(index) > 1 and not (index[1:] >= index[:-1]).all():
+            order = np.argsort(index, kind='stable')
+            index = index[order]
+        self._index = index
+        self._columns = {
+            name: np.asarray(values)[order] if order is not None else np.asarray(values)
+            for name, values in columns.items()
+        }
+        self._size = len(index)
+
+    @classmethod
+    def from_frame(cls, df, date_column):
+        return cls(
+            df[date_column].to_numpy(dtype='datetime64[ns]'),
+            {name: df[name].to_numpy() for name in df.columns if name != date_column}
+        )
+
+    @property
+    def index(self):
+        return self._index[:self._size]
+
+    @property
+    def columns(self):
+        return {name: values[:self._size] for name, values in self._columns.items()}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def start(self):
+        return self.index[0] if len(self.index) else None
+
+    @property
+    def end(self):
+        return self.index[-1] if len(self.index) else None
+
+    def bounds(self, start=None, end=None):
+        # Positions [lo, hi) covering start <= t <= end
+        lo = 0 if start is None else int(np.searchsorted(self.index, to_datetime64(start), side='left'))
+        hi = len(self.index) if end is None else int(np.searchsorted(self.index, to_datetime64(end), side='right'))
+        return lo, max(lo, hi)
+
+    def slice(self, start=None, end=None, columns=None):
+        lo, hi = self.bounds(start, end)
+        stored = self.columns
+        names = stored if columns is None else columns
+        return self.index[lo:hi], {name: stored[name][lo:hi] for name in names}
+
+    def append(self, index, columns):
+        # Add rows that are not older than the last one; returns the position of the first new row
+        index = np.asarray(index, dtype='datetime64[ns]')
+        start = self._size
+        if not len(index):
+            return start
+        if (start and index[0] < self.end) or (index[1:] < index[:-1]).any():
+            raise ValueError('appended rows must be in time order and not before the last row')
+        if columns.keys() != self._columns.keys():
+            raise ValueError(f'expected columns {sorted(self._columns)}')
+
+        size = start + len(index)
+        if size > len(self._index):
+            capacity = max(size, 2 * len(self._index), 1024)
+            self._index = _grow(self._index[:start], capacity)
+            self._columns = {name: _grow(values[:start], capacity) for name, values in self._columns.items()}
+        self._index[start:size] = index
+        for name, values in self._columns.items():
+            values[start:size] = columns[name]
+        # Readers only see the new rows once they are complete
+        self._size = size
+        return start
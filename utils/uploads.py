@@ -0,0 +1,283 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+import flask
+
+from utils.config import CACHE_DIR, UPLOAD_MAX_BYTES, UPLOAD_PARSE_ROWS
+from utils.datasets import CATEGORIES_SUFFIX, install_npy_dataset, npy_staging_dir
+
+UPLOAD_DIR = os.path.join(CACHE_DIR, 'uploads')
+
+# Request bodies are copied to disk in blocks of this size, never held whole in memory
+COPY_BLOCK_BYTES = 1024 * 1024
+
+# Unfinished or finished uploads older than this are removed when a new one starts
+UPLOAD_MAX_AGE = 24 * 3600
+
+# Datasets an upload may replace, with the columns (and their kinds) the charts read
+UPLOAD_TARGETS = {
+    'time_series': {'label': '時系列', 'columns': {'date': 'datetime', 'value_a': 'number', 'value_b': 'number'}},
+    'scatter': {'label': '散布図', 'columns': {'x': 'number', 'y': 'number', 'size': 'number', 'category': 'string'}},
+    'bar': {'label': '棒グラフ', 'columns': {'category': 'string', 'value': 'number'}},
+    'three_d': {'label': '3D散布図', 'columns': {'x': 'number', 'y': 'number', 'z': 'number', 'group': 'string'}},
+}
+
+UPLOAD_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+
+_UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _upload_path(upload_id, *parts):
+    if not _UPLOAD_ID.match(upload_id or ''):
+        raise ValueError('invalid upload id')
+    return os.path.join(UPLOAD_DIR, upload_id, *parts)
+
+
+def read_status(upload_id):
+    try:
+        with open(_upload_path(upload_id, 'status.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'state': 'waiting'}
+
+
+def write_status(upload_id, **status):
+    # Atomic replace, so a worker polling for progress never reads a half-written file
+    path = _upload_path(upload_id, 'status.json')
+    staging = f'{path}.{os.getpid()}.{threading.get_ident()}'
+    with open(staging, 'w') as f:
+        json.dump(status, f)
+    os.replace(staging, path)
+    return status
+
+
+def prune_uploads(max_age=UPLOAD_MAX_AGE):
+    cutoff = time.time() - max_age
+    try:
+        names = os.listdir(UPLOAD_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        path = os.path.join(UPLOAD_DIR, name)
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except FileNotFoundError:
+            pass
+
+
+# --- incremental parsing ---------------------------------------------------------
+
+# On-disk dtype per column kind; numbers are float64 whatever a single chunk looks like, and
+# strings are stored as codes into <column>.categories.npy
+COLUMN_DTYPES = {'datetime': 'datetime64[ns]', 'number': 'float64', 'string': 'int32'}
+
+
+class _ColumnWriter:
+    # Streams one column to the staging directory chunk by chunk, so parsing holds a single
+    # chunk in memory however large the file is. The raw values go to <column>.npy.part while
+    # the row count is unknown; finish() writes the .npy header and copies them over in blocks.
+
+    def __init__(self, directory, column, kind):
+        self.path = os.path.join(directory, f'{column}.npy')
+        self.categories_path = os.path.join(directory, column + CATEGORIES_SUFFIX)
+        self.kind = kind
+        self.categories = {}  # value -> code, in order of first appearance
+        self.rows = 0
+        self._part = open(self.path + '.part', 'wb')
+
+    def _convert(self, series):
+        import numpy as np
+        import pandas as pd
+
+        if self.kind == 'datetime':
+            return pd.to_datetime(series).to_numpy(dtype='datetime64[ns]')
+        if self.kind == 'number':
+            return pd.to_numeric(series).to_numpy(dtype=np.float64)
+        codes, uniques = pd.factorize(series.astype(str))
+        known = np.array([self.categories.setdefault(value, len(self.categories)) for value in uniques], dtype=np.int32)
+        return known[codes]
+
+    def write(self, series):
+        values = self._convert(series)
+        values.tofile(self._part)
+        self.rows += len(values)
+
+    def close(self):
+        self._part.close()
+
+    def finish(self, block_rows=UPLOAD_PARSE_ROWS):
+        import numpy as np
+
+        self.close()
+        dtype = np.dtype(COLUMN_DTYPES[self.kind])
+        part = np.memmap(self.path + '.part', dtype=dtype, mode='r', shape=(self.rows,))
+        remap = None
+        if self.kind == 'string':
+            # Sorted categories, as pandas would give them
+            names = np.array(list(self.categories), dtype=str)
+            order = np.argsort(names, kind='stable')
+            remap = np.empty(len(order), dtype=np.int32)
+            remap[order] = np.arange(len(order), dtype=np.int32)
+            np.save(self.categories_path, names[order], allow_pickle=False)
+        out = np.lib.format.open_memmap(self.path, mode='w+', dtype=dtype, shape=(self.rows,))
+        for lo in range(0, self.rows, block_rows):
+            block = part[lo:lo + block_rows]
+            out[lo:lo + block_rows] = block if remap is None else remap[block]
+        out.flush()
+        del out, part
+        os.remove(self.path + '.part')
+
+
+def iter_frames(path, file_format, columns, chunk_rows=UPLOAD_PARSE_ROWS):
+    # DataFrames of at most chunk_rows rows, restricted to the wanted columns
+    if file_format == 'csv':
+        import pandas as pd
+
+        yield from pd.read_csv(path, usecols=list(columns), chunksize=chunk_rows)
+    else:
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=list(columns)):
+            yield batch.to_pandas()
+
+
+def parse_upload(path, file_format, target, directory, progress=None):
+    # Writes one .npy per column of the target into directory; returns the row count
+    schema = UPLOAD_TARGETS[target]['columns']
+    writers = {column: _ColumnWriter(directory, column, kind) for column, kind in schema.items()}
+    rows = 0
+    try:
+        for frame in iter_frames(path, file_format, schema):
+            for column, writer in writers.items():
+                writer.write(frame[column])
+            rows += len(frame)
+            if progress is not None:
+                progress(rows)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    if not rows:
+        raise ValueError('ファイルにデータ行がありません')
+    for writer in writers.values():
+        writer.finish()
+    return rows
+
+
+def _ingest(upload_id, path, file_format, target, status):
+    def progress(rows):
+        write_status(upload_id, **{**status, 'state': 'parsing', 'rows': rows})
+
+    staging = npy_staging_dir(target)
+    try:
+        rows = parse_upload(path, file_format, target, staging, progress)
+        install_npy_dataset(target, staging)
+    except Exception as e:  # noqa: BLE001  (reported to the browser through the status file)
+        shutil.rmtree(staging, ignore_errors=True)
+        write_status(upload_id, **{**status, 'state': 'error', 'message': str(e)})
+    else:
+        write_status(upload_id, **{**status, 'state': 'done', 'rows': rows})
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# --- HTTP endpoints ----------------------------------------------------------------
+
+def install_upload_routes(app, route='_upload'):
+    # POST   /_upload/<id>/chunk?offset=&total=&filename=&target=   raw bytes of one slice
+    # POST   /_upload/<id>/complete                                  parse in the background
+    # GET    /_upload/<id>/status                                    progress as JSON
+    server = app.server
+    prefix = app.config.routes_pathname_prefix + route
+
+    def error(message, status=400, **extra):
+        return flask.jsonify({'error': message, **extra}), status
+
+    @server.route(prefix + '/<upload_id>/chunk', methods=['POST'])
+    def upload_chunk(upload_id):
+        request = flask.request
+        try:
+            data_path = _upload_path(upload_id, 'data')
+            offset = int(request.args['offset'])
+            total = int(request.args['total'])
+        except (KeyError, ValueError):
+            return error('invalid upload request')
+
+        if offset == 0:
+            filename = os.path.basename(request.args.get('filename', ''))
+            target = request.args.get('target')
+            file_format = UPLOAD_FORMATS.get(os.path.splitext(filename)[1].lower())
+            prune_uploads()
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+            # Rejections are also written to the status file, which is what the page polls
+            message = None
+            if total == 0:
+                message = 'ファイルが空です'
+            elif total > UPLOAD_MAX_BYTES:
+                message = f'ファイルが大きすぎます (上限 {UPLOAD_MAX_BYTES // 1024 ** 2} MB)'
+            elif target not in UPLOAD_TARGETS:
+                message = '読み込み先のデータセットが不正です'
+            elif file_format is None:
+                message = 'CSV または Parquet ファイルを選択してください'
+            if message is not None:
+                write_status(upload_id, state='error', message=message, filename=filename)
+                return error(message)
+
+            open(data_path, 'wb').close()
+            write_status(upload_id, state='receiving', received=0, total=total, rows=0,
+                         filename=filename, format=file_format, target=target)
+
+        status = read_status(upload_id)
+        if status['state'] != 'receiving':
+            return error('upload is not accepting data', 409)
+        received = os.path.getsize(data_path)
+        if offset != received:
+            # The client resumes from the offset the server actually has
+            return error('unexpected offset', 409, received=received)
+
+        with open(data_path, 'ab') as f:
+            while True:
+                block = request.stream.read(COPY_BLOCK_BYTES)
+                if not block:
+                    break
+                received += len(block)
+                if received > status['total']:
+                    return error('more data than announced', 400)
+                f.write(block)
+
+        status = write_status(upload_id, **{**status, 'received': received})
+        return flask.jsonify(status)
+
+    @server.route(prefix + '/<upload_id>/complete', methods=['POST'])
+    def upload_complete(upload_id):
+        try:
+            data_path = _upload_path(upload_id, 'data')
+        except ValueError:
+            return error('invalid upload request')
+        status = read_status(upload_id)
+        if status['state'] != 'receiving' or status['received'] != status['total']:
+            return error('upload is incomplete', 409, received=status.get('received'))
+
+        status = write_status(upload_id, **{**status, 'state': 'parsing'})
+        threading.Thread(
+            target=_ingest,
+            args=(upload_id, data_path, status['format'], status['target'], status),
+            daemon=True
+        ).start()
+        return flask.jsonify(status)
+
+    @server.route(prefix + '/<upload_id>/status')
+    def upload_status(upload_id):
+        if not _UPLOAD_ID.match(upload_id):
+            return error('invalid upload request')
+        response = flask.jsonify(read_status(upload_id))
+        response.cache_control.no_store = True
+        return response